@@ -41,6 +41,13 @@ from utils.gisoglobals import *
 logger = logging.getLogger(__name__)
 logger.addHandler(logging.NullHandler())
 
+# <dir>/<name>-<version>-<release>.<arch>.rpm
+_RPM_PATH_RE = re.compile(r'(.*/)(.*)-(.*)-(.*)\.(.*)(\.rpm)')
+# Leading part of an rpm release with up to two dotted suffixes
+_REL_TWO_SUFFIX_RE = re.compile(r'(.*)\.(.*)\.(.*)')
+_REL_ONE_SUFFIX_RE = re.compile(r'(.*)\.(.*)')
+_REL_NO_SUFFIX_RE = re.compile(r'(.*)')
+
 class BridgeRpmDB:
 
     class BridgeDBdirpath:
@@ -92,13 +99,13 @@ class BridgeRpmDB:
             finally:
                 os.unlink (os.path.join(self.fsroot, os.path.basename(rpmfile)))
         else:
-            m = re.search (r'(.*/)(.*)-(.*)-(.*)\.(.*)(\.rpm)', rpmfile)
+            m = _RPM_PATH_RE.search (rpmfile)
             rpmrel = m.groups()[3] 
-            m = re.search(r'(.*)\.(.*)\.(.*)', rpmrel)
+            m = _REL_TWO_SUFFIX_RE.search (rpmrel)
             if not m:
-                m = re.search (r'(.*)\.(.*)', rpmrel)
+                m = _REL_ONE_SUFFIX_RE.search (rpmrel)
             if not m:
-                m = re.search (r'(.*)', rpmrel)
+                m = _REL_NO_SUFFIX_RE.search (rpmrel)
             if m:
                 rpmrel = m.groups()[0]
         return rpmrel
@@ -42,6 +42,9 @@ import exrmod.load_matrix as load_matrix
 logger = logging.getLogger(__name__)
 logger.addHandler(logging.NullHandler())
 
+# DDTS id of a bridge smu, e.g. CSCab12345
+_DDTS_ID_RE = re.compile(r'CSC[a-z][a-z]\d{5}')
+
 def parsecli ():
     parser = argparse.ArgumentParser (description = "Test utility")
     parser.add_argument("--repo",
@@ -283,7 +286,7 @@ class GisoBridgeDB:
                 self.handle_rpm (pkg)
             elif pkg.endswith (".tar"):
                 self.handle_tar (pkg)
-            elif re.search('CSC[a-z][a-z]\d{5}', pkg):
+            elif _DDTS_ID_RE.search(pkg):
                 self.handle_ddts (pkg)
             else:
                 self.handle_release (pkg)
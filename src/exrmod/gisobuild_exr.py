@@ -32,6 +32,7 @@ import pathlib
 import yaml
 import glob
 import importlib
+import itertools
 sys.path.append(str(pathlib.Path(__file__).parents[1] / "utils"))
 import bes
 
@@ -181,17 +182,18 @@ def main (argv, infile):
                      (os.path.abspath(argv.bundle_iso)))
         #global global_platform_name
 
-        global_platform_name =  giso.get_bundle_iso_platform_name()
+        iso_platform = giso.get_bundle_iso_platform_name()
+        iso_version = giso.get_bundle_iso_version()
+        global_platform_name = iso_platform
         initialize_globals (cwd, argv, logger, global_platform_name)
         logger.info("\nPlatform: %s Version: %s" %
-                    (giso.get_bundle_iso_platform_name(),
-                     giso.get_bundle_iso_version()))
+                    (iso_platform, iso_version))
         #
         # 1.1 Perform Giso support prechecks
         #
-        if not Giso.is_platform_supported(giso.get_bundle_iso_platform_name()):
+        if not Giso.is_platform_supported(iso_platform):
             logger.error("Error: Golden ISO build is not supported for the "
-                         "platform %s " % (giso.get_bundle_iso_platform_name()))
+                         "platform %s " % (iso_platform))
             return
 
         if not giso.is_bundle_image_type_supported():
@@ -207,7 +209,7 @@ def main (argv, infile):
         #
         # 1.1.0 Check if migration option is provided for other platform than ASR9k
         #
-        if argv.migTar and giso.get_bundle_iso_platform_name().upper() != "ASR9K":
+        if argv.migTar and iso_platform.upper() != "ASR9K":
             logger.error("Error: Migration option is only applicable for ASR9k platform")
             sys.exit(-1)
 
@@ -216,7 +218,7 @@ def main (argv, infile):
             giso.is_tar_require = True
 
 
-        if hasattr(argv, 'fullISO') and argv.fullISO and giso.get_bundle_iso_platform_name().upper() != "XRV9K":
+        if hasattr(argv, 'fullISO') and argv.fullISO and iso_platform.upper() != "XRV9K":
             logger.error("Error: fullISO option is only applicable for XRV9k platform")
             sys.exit(-1)
 
@@ -265,19 +267,19 @@ def main (argv, infile):
 
             # 1.3.1 Scan repository and build RPM data base.
             rpm_db.populate_rpmdb(fs_root, argv.rpmRepo, pkglist,
-                 giso.get_bundle_iso_platform_name(),
-                 giso.get_bundle_iso_version(),
+                 iso_platform,
+                 iso_version,
                  giso.is_full_iso_require,
                  giso.ExtendRpmRepository)
 
             # 1.3.2 Seperate Cisco and TP rpms in RPM data base
-            rpm_db.populate_tp_cisco_list(giso.get_bundle_iso_platform_name())
+            rpm_db.populate_tp_cisco_list(iso_platform)
 
             # 1.3.3 Filter and discard RPMs not matching desired Version 
-            rpm_db.filter_cisco_rpms_by_release(giso.get_bundle_iso_version())
+            rpm_db.filter_cisco_rpms_by_release(iso_version)
 
             # 1.3.4 Filter and discard RPMs not matching platform
-            rpm_db.filter_cisco_rpms_by_platform(giso.get_bundle_iso_platform_name())
+            rpm_db.filter_cisco_rpms_by_platform(iso_platform)
 
             # 1.3.5 Filter and discard TP RPM which are not part of release-file 
             # rpm_db.filter_tp_rpms_by_release_rpm_list(
@@ -287,17 +289,17 @@ def main (argv, infile):
                 pathlib.Path(giso.get_bundle_iso_mount_path())):
                 rpm_db.filter_tp_rpms_by_supported_arch(
                     pathlib.Path(giso.get_bundle_iso_mount_path()),
-                    giso.get_bundle_iso_version()
+                    iso_version
                 )
             else:
                 rpm_db.filter_tp_rpms_by_release_rpm_list(
-                giso.get_bundle_iso_mount_path(), giso.get_bundle_iso_version())
+                giso.get_bundle_iso_mount_path(), iso_version)
             
             
 
             # 1.3.6 Filter and discard older version HOSTOS RPMS
             rpm_db.filter_multiple_hostos_spirit_boot_rpms(
-                giso.get_bundle_iso_platform_name())
+                iso_platform)
 
             rpm_db.filter_superseded_rpms()
 
@@ -316,7 +318,7 @@ def main (argv, infile):
             # valid RPMs in RPM database
         if rpm_db.get_cisco_rpm_count() == 0 and rpm_db.sp_info == None:
             logger.info("Warning: No RPMS or Optional Matching %s packages "
-                        "found in repository" % (giso.get_bundle_iso_version()))
+                        "found in repository" % (iso_version))
             if not argv.xrConfig and not argv.script and rpm_db.get_tp_rpm_count() == 0:
                 logger.info("Info: No Valid rpms nor XR config file found. "
                             "Nothing to do")
@@ -330,34 +332,39 @@ def main (argv, infile):
         #
         # get ISO RPM key
         #
-        if not giso.is_full_iso_require and not giso.is_skip_dep_check:
+        check_compat = not giso.is_full_iso_require and \
+                       not giso.is_skip_dep_check
+        if check_compat:
             giso.set_iso_rpm_key(fs_root)
 
         # 1.5 Compatability Check
+        rp_arch = Giso.get_rp_arch()
+        multi_arch_tp_rpms = is_multi_arch_tp_rpms_supported(
+            pathlib.Path(giso.get_bundle_iso_mount_path()))
         for vm_type in giso.VM_TYPE:
             supp_arch = giso.get_supp_arch(vm_type)
             dup_rpm_files = []
             final_rpm_files = []
             local_card_arch_files = []
-            for arch in supp_arch:
-                if arch == "arm" and argv.x86_only:
-                    logger.info("\nSkipping arm rpms as given x86_only option")
-                    continue
-                arch_rpm_files = list(map(lambda rpm: rpm.file_name,
-                                     rpm_db.get_cisco_rpms_by_vm_arch(vm_type,
-                                                                      arch) +
-                                     rpm_db.get_tp_rpms_by_vm_arch(vm_type,
-                                                                   arch)))
+            # supp_arch itself stays complete for the missing rpm check below
+            build_archs = supp_arch
+            if argv.x86_only and "arm" in supp_arch:
+                logger.info("\nSkipping arm rpms as given x86_only option")
+                build_archs = [arch for arch in supp_arch if arch != "arm"]
+            for arch in build_archs:
+                arch_rpm_files = [rpm.file_name for rpm in itertools.chain(
+                                  rpm_db.get_cisco_rpms_by_vm_arch(vm_type, arch),
+                                  rpm_db.get_tp_rpms_by_vm_arch(vm_type, arch))]
                 if arch_rpm_files:
                     if vm_type == CALVADOS_SUBSTRING:
                         vmtype = SYSADMIN_SUBSTRING
                     else:
                         vmtype = vm_type
                     logger.info("\nFollowing %s %s rpm(s) will be used for building Golden ISO:\n" % (vmtype, arch))
-                    list(map(lambda file_name: logger.info("\t(+) %s" % file_name),
-                        arch_rpm_files))
+                    logger.info("\n".join("\t(+) %s" % file_name
+                                          for file_name in arch_rpm_files))
                     final_rpm_files += arch_rpm_files
-                    if Giso.get_rp_arch() != arch:
+                    if rp_arch != arch:
                         continue
                     else:
                         local_card_arch_files = arch_rpm_files
@@ -368,16 +375,13 @@ def main (argv, infile):
             # missing_arch_rpms = [[Arm rpm list][x86_54 rpm list]]
             missing = False
             missing_arch_rpms = rpm_db.get_missing_arch_rpm(
-                vm_type, supp_arch,
-                is_multi_arch_tp_rpms_supported(pathlib.Path(giso.get_bundle_iso_mount_path())))
-            for arch in list(missing_arch_rpms.keys()):
-                if arch == "arm" and argv.x86_only:
-                    logger.debug("Skipping arm rpms in missing_arch_rpms check as given x86_only option")
-                    continue
-                list(map(lambda x: logger.error("\tError: Missing %s.%s.rpm" %
-                                           (x, arch)),
-                    missing_arch_rpms[arch]))
+                vm_type, supp_arch, multi_arch_tp_rpms)
+            if argv.x86_only:
+                missing_arch_rpms.pop("arm", None)
+            for arch in missing_arch_rpms:
                 if len(missing_arch_rpms[arch]):
+                    logger.error("\n".join("\tError: Missing %s.%s.rpm" % (x, arch)
+                                            for x in missing_arch_rpms[arch]))
                     missing = True
             if missing:
                 logger.info("Add the missing rpms to repository and "
@@ -387,7 +391,7 @@ def main (argv, infile):
             #
             # 1.5.2   Perform Compatibilty check
             #
-            if not giso.is_full_iso_require and not giso.is_skip_dep_check:
+            if check_compat:
                 if local_card_arch_files:
                     result, dup_rpm_files = \
                         giso.do_compat_check(local_card_arch_files, vm_type)
@@ -402,16 +406,20 @@ def main (argv, infile):
             if dup_rpm_files:
                 logger.info("\nSkipping following rpms from repository "
                             "since they are already present in base ISO:\n")
-                list(map(lambda file_name: logger.error("\t(-) %s" % file_name),
-                    dup_rpm_files))
-                final_rpm_files = list(set(final_rpm_files) -
-                                       set(dup_rpm_files))
+                logger.error("\n".join("\t(-) %s" % file_name
+                                        for file_name in dup_rpm_files))
+                # Order preserving, unlike a set difference, so the giso
+                # lists the rpms in the same order from build to build
+                dup_rpm_names = set(dup_rpm_files)
+                final_rpm_files = [file_name for file_name
+                                   in dict.fromkeys(final_rpm_files)
+                                   if file_name not in dup_rpm_names]
                 # TBD Remove other arch rpms as well.
 
             if final_rpm_files:
                 if dup_rpm_files:
                     logger.debug("\nFollowing updated %s rpm(s) will be used for building Golden ISO:\n" % vm_type)
-                    list(map(lambda x: logger.debug('\t(+) %s' % x), final_rpm_files))
+                    logger.debug("\n".join('\t(+) %s' % x for x in final_rpm_files))
                 giso.set_vm_rpm_file_paths(final_rpm_files, vm_type)
                 if not giso.is_full_iso_require:
                     logger.info("\n\t...RPM compatibility check [PASS]")
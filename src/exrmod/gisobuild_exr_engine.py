@@ -21,9 +21,15 @@ or implied.
 from datetime import datetime
 import subprocess
 import argparse
+import concurrent.futures
+import errno
 import functools
 import getpass
+import fnmatch
 import glob
+import gzip
+import hashlib
+import io
 import logging
 import os
 import re
@@ -31,12 +37,14 @@ import shutil
 import socket
 import sys
 import tempfile
+import threading
 import yaml
 import string
 import stat
 import pprint
 from utils import gisoutils, bes
 import pathlib
+from collections import Counter, defaultdict
 from typing import List
 
 __version__ = '0.37'
@@ -59,14 +67,51 @@ custom_mdata = {
                 "CARDTYPE" : '(none)'
                }
 
-try:
-    from itertools import zip_longest
-except ImportError:
-    from itertools import izip_longest as zip_longest
 _subfield_pattern = re.compile(
     r'(?P<junk>[^a-zA-Z0-9]*)((?P<text>[a-zA-Z]+)|(?P<num>[0-9]+))'
 )
 
+@functools.lru_cache(maxsize=4096)
+def _tokenize_rpm_field(field):
+    '''
+    Split an rpm label field into a tuple of subfields that sort in the
+    desired order: text subfields as (0, text_value) and numeric
+    subfields as (1, int_value). Fewer subfields sorts as older.
+    '''
+    subfields = []
+    for subfield in _subfield_pattern.finditer(field):
+        text = subfield.group('text')
+        if text is not None:
+            subfields.append((0, text))
+        else:
+            subfields.append((1, int(subfield.group('num'))))
+    return tuple(subfields)
+
+# Splits a version string into alternating digit and non-digit runs,
+# e.g. "0.1.p10" -> "0", ".", "1", ".p", "10"
+_VER_KEY_RE = re.compile(r'(\d+)|(\D+)')
+# DDTS id carried in Cisco SMU names, e.g. CSCab12345
+_CSC_ID_RE = re.compile(r'CSC[a-z]{2}\d{5}')
+# "<field>: <value>" entries of an iso_info.txt
+_ISO_INFO_FIELD_RE = re.compile(r'(Name|Version|PKG_FORMAT_VER): (\S+)')
+# "Signature   : ..." line of an rpm -qi info block
+_RPM_SIGNATURE_RE = re.compile(r'^Signature\s*:(.*)$', re.MULTILINE)
+# Initrd checksum line of an iso_info.txt
+_INITRD_MD5_RE = re.compile(rb'(Initrd: initrd\.img )[^\n]*(?=\n)')
+# "Lineup = ..." line of an etc/show_version.txt
+_LINEUP_LINE_RE = re.compile(rb'^.*Lineup =.*$', re.MULTILINE)
+# "isoinfo -l" entry of initrd.img: size, then [ extent flags ] and name
+_ISOINFO_INITRD_RE = re.compile(r'^\S+\s+\d+\s+\d+\s+\d+\s+(\d+)\s.*'
+                                r'\[\s*(\d+)\s+\d+\]\s+initrd\.img\s*$',
+                                re.MULTILINE)
+# "isoinfo -l" file entry: size, then [ extent flags ] ahead of the name
+_ISOINFO_ENTRY_RE = re.compile(r'^\S+\s+\d+\s+\d+\s+\d+\s+(\d+)\s.*'
+                               r'\[\s*(\d+)\s+\d+\]')
+
+# Use the libyaml backed loader/dumper when PyYAML was built with it
+_YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+_YAML_DUMPER = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+
 try:
     sys.path.append (
         str(pathlib.Path(os.path.abspath(__file__)).parents[2])
@@ -92,10 +137,13 @@ XR_SUBSTRING = 'XR'
 OPTIONS = None
 DEFAULT_RPM_PATH = 'giso/<rpms>'
 SIGNED_RPM_PATH =  'giso/boot/initrd.img/<rpms>'
+REPO_FILE_SUFFIXES = ('.rpm', '.iso')
 SIGNED_NCS5500_RPM_PATH =  'giso/boot/initrd.img/iso/system_image.iso/boot/initrd.img/<rpms>'
 SIGNED_651_NCS5500_RPM_PATH = 'giso/boot/initrd.img/iso/system_image.iso/<rpms>'
 global_platform_name="None"
 BZIMAGE_712="bzImage-7.1.2"
+# ncs5500 releases whose bzImage can't PXE boot a >2GB ISO
+BZIMAGE_712_RELEASES = frozenset(["6.6.3", "6.6.4", "7.0.2"])
 
 def insideCUBES():
     contEnvPath = pathlib.Path("/run/.containerenv")
@@ -129,6 +177,38 @@ def run_cmd(cmd):
         raise RuntimeError("Error CMD=%s returned --->%s" % (cmd, out))
     return dict(rc=sprc, output=out)
 
+def run_argv(argv):
+    '''
+        run_cmd for a command given as a list of arguments. It is run
+        without a shell, so arguments need no quoting and no extra bash
+        process is forked. A missing tool fails like any other command.
+    '''
+    try:
+        process = subprocess.run(argv, stdout=subprocess.PIPE,
+                                 stderr=subprocess.PIPE)
+    except OSError as error:
+        raise RuntimeError("Error CMD=%s returned --->%s"
+                           % (" ".join(argv), error))
+    out = process.stdout.decode('utf8', 'replace')
+    if process.returncode != 0:
+        out += process.stderr.decode('utf8', 'replace')
+        raise RuntimeError("Error CMD=%s returned --->%s"
+                           % (" ".join(argv), out))
+    return dict(rc=process.returncode, output=out)
+
+def run_cmd_silent(cmd):
+    '''
+        run_cmd for commands whose output is of no interest (cp, rm, chmod
+        ...). stdout is discarded rather than captured and decoded; stderr
+        is still kept for the error raised on failure.
+    '''
+    process = subprocess.run(cmd, stdout=subprocess.DEVNULL,
+                             stderr=subprocess.PIPE, shell=True,
+                             executable='/bin/bash')
+    if process.returncode != 0:
+        raise RuntimeError("Error CMD=%s returned --->%s"
+                           % (cmd, process.stderr.decode('utf8', 'replace')))
+
 def run_cmd2 (cmd):
     process = subprocess.Popen(cmd, stdout=subprocess.PIPE,
                                stderr=subprocess.PIPE, shell=True)
@@ -165,6 +245,231 @@ def is_satisfied_ignoring_epoch(req: str, rpm_dir: str) -> bool:
                     return True
     return False
 
+def _split_rpm_file_name(rpm_file):
+    '''
+        Split "<name>-<version>-<release>.<arch>.rpm" into its four parts,
+        scanning from the right. Returns None if rpm_file has another shape.
+    '''
+    if not rpm_file.endswith('.rpm'):
+        return None
+    name_ver_rel, _, arch = rpm_file[:-len('.rpm')].rpartition('.')
+    name_ver, _, rel = name_ver_rel.rpartition('-')
+    name, _, ver = name_ver.rpartition('-')
+    if not (name and ver and rel and arch):
+        return None
+    return name, ver, rel, arch
+
+def _scandir_paths(path):
+    '''
+        Return paths of the non hidden entries in directory: "path".
+        Same result as glob.glob(path + "/*") in a single directory read.
+    '''
+    with os.scandir(path) as entries:
+        return [entry.path for entry in entries
+                if not entry.name.startswith('.')]
+
+def _log_lines(level, lines):
+    '''
+    Log the given lines as a single multi-line record. The lines are
+    only formatted when the level is enabled.
+    '''
+    if logger.isEnabledFor(level):
+        message = "\n".join(lines)
+        if message:
+            logger.log(level, message)
+
+def _link_or_copy(src, dst_dir):
+    '''
+        Hardlink file: "src" into directory: "dst_dir", falling back to a
+        copy when a link is not possible (e.g. across filesystems).
+    '''
+    dst = os.path.join(dst_dir, os.path.basename(src))
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy(src, dst)
+    return dst
+
+# os.copy_file_range() is Python 3.8+ on Linux only
+_HAVE_COPY_FILE_RANGE = hasattr(os, "copy_file_range")
+
+def _copy_in_kernel(src, dst_dir):
+    '''
+        shutil.copy of file: "src" into directory: "dst_dir" with the data
+        moved by copy_file_range(), so it never passes through user space
+        and is reflinked where the filesystem supports it. Falls back to
+        shutil.copy where copy_file_range() is unavailable or refused.
+    '''
+    dst = os.path.join(dst_dir, os.path.basename(src))
+    if not _HAVE_COPY_FILE_RANGE:
+        return shutil.copy(src, dst)
+    try:
+        with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+            remaining = os.fstat(fsrc.fileno()).st_size
+            while remaining > 0:
+                copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(),
+                                            remaining)
+                if not copied:
+                    # Source shorter than its size, redo with a plain copy
+                    raise OSError("short copy_file_range() of %s" % src)
+                remaining -= copied
+    except OSError:
+        return shutil.copy(src, dst)
+    shutil.copymode(src, dst)
+    return dst
+
+def _copy_dir_files(src_dir, dst_dir):
+    '''
+        Copy the files of directory: "src_dir" into "dst_dir", like
+        "cp src_dir/* dst_dir/", and return the names copied. Returns
+        None when "src_dir" does not exist.
+    '''
+    try:
+        paths = _scandir_paths(src_dir)
+    except FileNotFoundError:
+        return None
+    names = []
+    for path in paths:
+        shutil.copy(path, dst_dir)
+        names.append(os.path.basename(path))
+    return names
+
+def _md5sum(path):
+    '''
+        Return the hex md5 digest of file: "path", as printed by md5sum.
+    '''
+    md5 = hashlib.md5()
+    with open(path, 'rb') as fd:
+        for chunk in iter(functools.partial(fd.read, 1024 * 1024), b''):
+            md5.update(chunk)
+    return md5.hexdigest()
+
+@functools.lru_cache(maxsize=None)
+def _gzip_command():
+    '''
+        Compressor for rebuilt initrds: pigz when installed, which
+        compresses on all cores with gzip compatible output, else gzip.
+    '''
+    return "pigz" if shutil.which("pigz") else "gzip"
+
+def _copy_glob(pattern, dst_dir):
+    '''
+        Copy the files matching glob: "pattern" into "dst_dir", like
+        "cp -f <pattern> dst_dir/" without forking a shell.
+    '''
+    for path in glob.iglob(pattern):
+        shutil.copy(path, dst_dir)
+
+def _move_glob(pattern, dst_dir):
+    '''
+        Move the files or directories matching glob: "pattern" into
+        "dst_dir", like "mv -f <pattern> dst_dir/". This is a rename on the
+        same filesystem and a copy plus delete across filesystems.
+    '''
+    # glob, not iglob: the matches are moved out of the listed directory
+    for path in glob.glob(pattern):
+        dst = os.path.join(dst_dir, os.path.basename(path))
+        try:
+            os.rename(path, dst)
+        except OSError as error:
+            # Only a cross filesystem move falls back to copy plus delete;
+            # anything else (e.g. dst a non empty directory) fails like mv
+            if error.errno != errno.EXDEV:
+                raise
+            shutil.move(path, dst)
+
+def _clone_tree(src_dir, dst_dir):
+    '''
+        Copy directory: "src_dir" to the new directory: "dst_dir", like
+        shutil.copytree. File data is shared copy-on-write where the
+        filesystem supports reflinks and copied otherwise. Hardlinks are
+        not an option as the copy is edited in place afterwards.
+    '''
+    run_cmd_silent("cp -rL --preserve=mode,timestamps --reflink=auto %s %s"
+                   % (src_dir, dst_dir))
+
+def _extract_initrd(initrd, dst_dir):
+    '''
+        Extract the (optionally gzipped) cpio archive: "initrd" into
+        "dst_dir". cpio runs in a subshell so the cwd of this process,
+        which is shared by all threads, is left alone.
+    '''
+    run_cmd("zcat -f %s | (cd %s && cpio -id)" % (initrd, dst_dir))
+
+def _rmtree_in_background(path):
+    '''
+        Remove directory tree: "path" without waiting for it. The tree is
+        first renamed out of the way into a fresh trash directory next to
+        it, so "path" can be reused at once, then deleted by a thread.
+        The thread is not a daemon: the interpreter waits for it on exit
+        rather than leaving a half deleted tree behind.
+    '''
+    trash_dir = tempfile.mkdtemp(dir=os.path.dirname(os.path.abspath(path)),
+                                 prefix=".%s.trash." % os.path.basename(path))
+    os.rename(path, os.path.join(trash_dir, os.path.basename(path)))
+    threading.Thread(target=shutil.rmtree, args=(trash_dir,),
+                     kwargs={'ignore_errors': True}).start()
+
+def _mkisofs(iso_file, root_dir):
+    '''
+        Create iso: "iso_file" from directory: "root_dir", made El Torito
+        bootable when the tree carries boot/grub/stage2_eltorito.
+    '''
+    cmd = "mkisofs -R -uid 0 -gid 0 -input-charset utf-8"
+    if os.path.exists(os.path.join(root_dir, "boot/grub/stage2_eltorito")):
+        cmd += " -b boot/grub/stage2_eltorito -no-emul-boot" \
+               " -boot-load-size 4 -boot-info-table"
+    run_cmd("%s -o %s %s" % (cmd, iso_file, root_dir))
+
+def _chmod_tree(path, mode):
+    '''
+        Equivalent of "chmod -R <mode> path" without forking. Symlinks are
+        skipped, as chmod -R does, since they may point outside the tree.
+    '''
+    os.chmod(path, mode)
+    for root, dirs, files in os.walk(path):
+        for name in dirs + files:
+            entry = os.path.join(root, name)
+            if not os.path.islink(entry):
+                os.chmod(entry, mode)
+
+def _cpio_member(fobj, pattern):
+    '''
+        Scan the cpio newc archive read from file object: "fobj" and return
+        the contents of the first member whose name matches glob: "pattern",
+        like "cpio -i --to-stdout pattern" does. None if there is no match.
+    '''
+    while True:
+        header = fobj.read(110)
+        if len(header) < 110 or header[:6] not in (b'070701', b'070702'):
+            return None
+        filesize = int(header[54:62], 16)
+        namesize = int(header[94:102], 16)
+        name = fobj.read(namesize).rstrip(b'\0').decode(errors='replace')
+        # Name and data are each padded to a 4 byte boundary
+        fobj.read(-(110 + namesize) % 4)
+        if name == 'TRAILER!!!':
+            return None
+        if fnmatch.fnmatchcase(name, pattern):
+            return fobj.read(filesize)
+        remaining = filesize + (-filesize % 4)
+        while remaining:
+            chunk = fobj.read(min(remaining, 1024 * 1024))
+            if not chunk:
+                return None
+            remaining -= len(chunk)
+
+def _lineup_of(show_version):
+    '''
+        Lineup from the contents of an etc/show_version.txt, i.e. the third
+        field of its "Lineup =" line. Empty string if not found.
+    '''
+    match = _LINEUP_LINE_RE.search(show_version or b'')
+    if not match:
+        return ""
+    fields = match.group(0).split(b' ')
+    return fields[2].decode() if len(fields) > 2 else ""
+
 class Migtar:
     ISO="iso"
     EFI="EFI"
@@ -199,13 +504,13 @@ class Migtar:
 
     def cleanup(self):
         if os.path.exists(self.BOOT_DIR):
-            run_cmd('rm -rf ' + self.BOOT_DIR)
+            run_cmd_silent('rm -rf ' + self.BOOT_DIR)
 
         if os.path.exists(self.TMP_BOOT_DIR):
-            run_cmd('rm -rf ' + self.TMP_BOOT_DIR)
+            run_cmd_silent('rm -rf ' + self.TMP_BOOT_DIR)
 
         if os.path.exists(self.EFI):
-            run_cmd('rm -rf ' + self.EFI)
+            run_cmd_silent('rm -rf ' + self.EFI)
 
         pwd=os.getcwd()
         dst_mpath = os.path.join(pwd, "upgrade_matrix")
@@ -216,7 +521,8 @@ class Migtar:
         if os.path.isfile(inputpath):
             filename = os.path.basename(inputpath)
             if not str(filename).endswith(".md5sum"):
-                run_cmd("echo $(md5sum " + inputpath + " | cut -d' ' -f1) > " + inputpath + ".md5sum")
+                with open(inputpath + ".md5sum", 'w') as fd:
+                    fd.write(_md5sum(inputpath) + "\n")
             return
         for path in os.listdir(inputpath):
             abspath = os.path.join(inputpath, path)
@@ -242,18 +548,18 @@ class Migtar:
 
         if os.path.exists(self.dst_system_tar):
             logger.debug("Removing old tar file %s " % self.dst_system_tar)
-            run_cmd('rm -rf ' + self.dst_system_tar)
+            run_cmd_silent('rm -rf ' + self.dst_system_tar)
     
         # Check if Boot Directory exists
         if os.path.exists(self.BOOT_DIR):
             logger.debug("Removing old boot dir %s " % self.BOOT_DIR)
-            run_cmd('rm -rf '+ self.BOOT_DIR)
+            run_cmd_silent('rm -rf '+ self.BOOT_DIR)
 
         # Check if system_image.iso file exists.
         if input_image != dst_system_image:
             logger.debug("Copying given ISO(%s) to migration tar name(%s)" 
                         % (input_image, dst_system_image))
-            run_cmd('cp -f ' + input_image + " " + dst_system_image)
+            run_cmd_silent('cp -f ' + input_image + " " + dst_system_image)
 
         run_cmd('mkdir -p ' + workspace_path + "/tmp")
         TMP_INITRD=workspace_path+"/tmp/initrd.img"
@@ -271,21 +577,21 @@ class Migtar:
 
         logger.debug("Getting BOOT_DIR(%s) " % self.BOOT_DIR)
         run_cmd("zcat " + TMP_INITRD + " | cpio -id " + self.BOOT_DIR + "/*")
-        run_cmd("chmod -R 777 %s"%(self.BOOT_DIR))
+        run_cmd_silent("chmod -R 777 %s"%(self.BOOT_DIR))
 
         logger.debug("Deleting tmp path (%s) in workspace path" 
                      %  workspace_path + "/tmp")
-        run_cmd( "rm -rf " + workspace_path + "/tmp")
+        run_cmd_silent( "rm -rf " + workspace_path + "/tmp")
 
         # Check if Tmp boot dir  Directory exists
         if os.path.exists(self.TMP_BOOT_DIR):
             logger.debug("Removing old tmp_boot dir %s " % self.TMP_BOOT_DIR)
-            run_cmd('rm -rf '+ self.TMP_BOOT_DIR)
+            run_cmd_silent('rm -rf '+ self.TMP_BOOT_DIR)
         run_cmd( "mkdir " + self.TMP_BOOT_DIR)
 
         logger.debug("Copying BZIMAGE(%s) to TMP_BOOT_DIR(%s) "
                      % (self.BZIMAGE, self.TMP_BOOT_DIR))
-        run_cmd( "cp " + self.BOOT_DIR + "/" + self.BZIMAGE + " " + self.TMP_BOOT_DIR)
+        run_cmd_silent( "cp " + self.BOOT_DIR + "/" + self.BZIMAGE + " " + self.TMP_BOOT_DIR)
 
         logger.debug("Moving INITRD(%s) to TMP_BOOT_DIR(%s) "
                      % (self.INITRD, self.TMP_BOOT_DIR))
@@ -308,7 +614,7 @@ class Migtar:
         with open(GRUB_CFG_FILE, 'w') as f:
             f.write(self.GRUB_CFG)
 
-        run_cmd( "rm -rf " + self.BOOT_DIR)
+        run_cmd_silent( "rm -rf " + self.BOOT_DIR)
         run_cmd ("mv " + self.TMP_BOOT_DIR + " " + self.BOOT_DIR)
 
         self.__generate_md5(os.path.abspath(self.BOOT_DIR))
@@ -347,6 +653,26 @@ class Rpm:
         self.prefixes = None
         self.xrrelease = None
         self.file_name = None
+        self._ver_key = None
+
+    #
+    # Sort key for the rpm version. Numeric runs compare as integers so
+    # that "0.1.p10" is newer than "0.1.p2". Each run is tagged with its
+    # kind so that numeric and text runs never get compared directly.
+    #
+    def get_ver_key(self):
+        if self._ver_key is None:
+            self._ver_key = tuple((1, int(num)) if num else (0, text)
+                                  for num, text in
+                                  _VER_KEY_RE.findall(self.version))
+        return self._ver_key
+
+    #
+    # Sort key for the rpm (version, release) label, as rpm orders them.
+    #
+    def get_label_key(self):
+        return (_tokenize_rpm_field(self.version),
+                _tokenize_rpm_field(self.release))
 
     def populate_mdata(self, fs_root, rpm, is_full_iso):
         self.file_name = rpm
@@ -465,12 +791,16 @@ class Rpm:
         # example /bin/sh
         # Ignore /bin/sh requires. 
         result_str_list = result["output"].split("\n")
-        requires_list = []
-        list(map(lambda x: requires_list.append(x),
-            [y for y in result_str_list if not y.startswith('/')]))
-
-        self.requires = requires_list
-        list(map(lambda x: logger.debug("%s:%s" % x), list(vars(self).items())))
+        self.requires = [y for y in result_str_list if not y.startswith('/')]
+
+        # These fields are compared and used as grouping keys by every
+        # filter pass, intern them so equal values share one object.
+        self.name = sys.intern(self.name)
+        self.version = sys.intern(self.version)
+        self.release = sys.intern(self.release)
+        self.arch = sys.intern(self.arch)
+        self.vm_type = sys.intern(self.vm_type)
+        _log_lines(logging.DEBUG, ("%s:%s" % x for x in vars(self).items()))
          
     #
     # RPM is Hostos RPM if rpm name has hostos keyword and platform name.
@@ -523,12 +853,14 @@ class Rpmdb:
         self.tp_release_rpms_xr_list = []
         # {"Host":{Arch:[rpmlist]},"Cal":{Arch:[rpmlist]},"Xr":{Arch:[rpmlist]}}
         # self.csc_rpms_by_vm_arch = {VM_TYPES"HOST": {}, "CALVADOS": {}, "XR": {}}
-        self.csc_rpms_by_vm_arch = {HOST_SUBSTRING: {}, 
-                                    CALVADOS_SUBSTRING: {}, 
-                                    XR_SUBSTRING: {}}
-        self.tp_rpms_by_vm_arch = {HOST_SUBSTRING: {},
-                                   CALVADOS_SUBSTRING: {}, 
-                                   XR_SUBSTRING: {}}
+        self.csc_rpms_by_vm_arch = {HOST_SUBSTRING: defaultdict(list), 
+                                    CALVADOS_SUBSTRING: defaultdict(list), 
+                                    XR_SUBSTRING: defaultdict(list)}
+        self.tp_rpms_by_vm_arch = {HOST_SUBSTRING: defaultdict(list),
+                                   CALVADOS_SUBSTRING: defaultdict(list), 
+                                   XR_SUBSTRING: defaultdict(list)}
+        self.tp_rpm_by_file_name = {}
+        self.tp_rpm_by_name_vm_arch = {}
         self.tmp_repo_path = None
         self.sp_info = None
         self.sp_names = [] 
@@ -550,14 +882,14 @@ class Rpmdb:
                 pre_req_rpm=("%s/%s*.rpm" %(repo_path, "asr9k-bng-supp-x64"))
                 pre_req_rpms += glob.glob(pre_req_rpm)
             for el in pre_req_rpms:
-                if not re.search('CSC[a-z][a-z]\d{5}', el):
+                if not _CSC_ID_RE.search(el):
                     pre_req_rpm_list.append(el)
         if "-mpls-te-" in pkg:
             for repo_path in repo_paths:
                 pre_req_rpm=("%s/*%s*.rpm" %(repo_path, "-mpls-"))
                 pre_req_rpms += glob.glob(pre_req_rpm)
             for el in pre_req_rpms:
-                if not re.search('CSC[a-z][a-z]\d{5}', el) and not "-mpls-te-" in el:
+                if not _CSC_ID_RE.search(el) and not "-mpls-te-" in el:
                     pre_req_rpm_list.append(el)
         return pre_req_rpm_list
 
@@ -574,7 +906,7 @@ class Rpmdb:
 
         for pkg in pkglist:
             for repo in repo_paths:
-                if re.search('CSC[a-z][a-z]\d{5}', pkg):
+                if _CSC_ID_RE.search(pkg):
 
                     # DDTS ID with tar extension
                     if pkg.endswith('.tar'):
@@ -745,10 +1077,12 @@ class Rpmdb:
         for repo in repo_paths:
             logger.info("\nScanning repository [%s]...\n" % (os.path.abspath(repo)))
 
-            if len(pkglist):
-                self.tmp_smu_repo_path, repo_files = Rpmdb.validate_and_return_list(platform, repo_paths, pkglist)
-            else:
-                repo_files += glob.glob(repo+"/*")
+            if not len(pkglist):
+                repo_files += _scandir_paths(repo)
+
+        # validate_and_return_list walks all of repo_paths itself
+        if len(pkglist):
+            self.tmp_smu_repo_path, repo_files = Rpmdb.validate_and_return_list(platform, repo_paths, pkglist)
 
         # Notify skipped packages which are not present in repo
         if len(pkglist) and "all" not in pkglist:
@@ -767,7 +1101,8 @@ class Rpmdb:
                 logger.info("\nFollowing packages in input for pkglist were skipped "
                         "as these are not present in the given repositories, "
                         "continuing with Golden ISO build...\n")
-            list(map(lambda file_name: logger.info("\t(-) %s" % os.path.basename(file_name)), skipped_pkg))
+            _log_lines(logging.INFO, ("\t(-) %s" % os.path.basename(file_name)
+                                      for file_name in skipped_pkg))
 
         if not len(repo_files) and not len(pkglist):
             logger.info('RPM repository directory \'%s\' is empty!!' % repo)
@@ -778,22 +1113,40 @@ class Rpmdb:
             return 0 
         # if it is gISO extend look at eRepo as well.
         if eRepo is not None:
-            repo_files += glob.glob(eRepo+"/*")
+            repo_files += _scandir_paths(eRepo)
         rpm_name_version_release_arch_list = []
         if full_iso:
             self.is_full_iso_require = True
         logger.info("Building RPM Database...")
+        # Only rpms and service pack isos are of interest, skip anything else
+        # (checksums, signatures, READMEs) before sniffing it with 'file'
+        candidate_files = []
+        for file_name in repo_files:
+            if file_name.lower().endswith(REPO_FILE_SUFFIXES):
+                candidate_files.append(file_name)
+            else:
+                logger.debug("Skipped non rpm/iso file %s" % file_name)
+        repo_files = candidate_files
         # creating temporary path to hold user provided rpms and sp's rpms
         pwd=cwd
         self.tmp_repo_path = tempfile.mkdtemp(dir=pwd)      
-        for file_name in repo_files:
-            result = run_cmd('file -b %s' % file_name)
-            if re.match(".*RPM.*", result["output"]):
-                shutil.copy(file_name, fs_root)
-                shutil.copy(file_name, self.tmp_repo_path)
-                rpm = Rpm()
-                rpm.populate_mdata(fs_root, os.path.basename(file_name), 
-                                   self.is_full_iso_require)
+        # Sniffing and querying a file forks several processes, so scan the
+        # files side by side. Files sharing a basename are copied to the
+        # same fs_root path, hence they are scanned in order by one task.
+        files_by_name = {}
+        for index, file_name in enumerate(repo_files):
+            files_by_name.setdefault(os.path.basename(file_name),
+                                     []).append((index, file_name))
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=max(1, min(8, len(files_by_name)))) as executor:
+            scanned = [entry for entries in executor.map(
+                           functools.partial(self.scan_repo_files, fs_root),
+                           files_by_name.values())
+                       for entry in entries]
+        # Back to repository order, as the first of duplicate rpms wins
+        scanned.sort(key=lambda entry: entry[0])
+        for _, file_name, file_type, rpm in scanned:
+            if rpm is not None:
                 rpm_name_ver_rel_arch = "%s-%s-%s.%s" % (rpm.name, rpm.version,
                                                          rpm.release, rpm.arch)
                 if rpm_name_ver_rel_arch \
@@ -811,8 +1164,7 @@ class Rpmdb:
                     else:    
                         self.rpmdb_version = "WRL7"
 
-
-            if re.match(".*SERVICEPACK.*", result["output"]):
+            elif "SERVICEPACK" in file_type:
                 sp_basename = os.path.basename(file_name) 
                 if platform in sp_basename.split('-')[0]:
                     sp_version = sp_basename.split('-')[-1]
@@ -826,11 +1178,13 @@ class Rpmdb:
 
         if self.sp_names:
             logger.info("\nFollowing are the valid Service pack present in the repository path provided in CLI\n")
-            list(map(lambda file_name: logger.info("\t(+) %s" % os.path.basename(file_name)), self.sp_names))
+            _log_lines(logging.INFO, ("\t(+) %s" % os.path.basename(file_name)
+                                      for file_name in self.sp_names))
 
         if self.sp_name_invalid:
             logger.info("\nSkipping following invalid Service pack from the repository path\n")
-            list(map(lambda file_name: logger.info("\t(-) %s" % os.path.basename(file_name)), self.sp_name_invalid))
+            _log_lines(logging.INFO, ("\t(-) %s" % os.path.basename(file_name)
+                                      for file_name in self.sp_name_invalid))
 
         try:
             self.process_sp()    
@@ -842,6 +1196,26 @@ class Rpmdb:
        
         return 0
 
+    #
+    # Scan repository files: "indexed_files", (index, path) pairs sharing a
+    # basename, in order. Returns (index, path, 'file -b' output, Rpm) per
+    # file; the Rpm is None unless the file is an rpm.
+    #
+    def scan_repo_files(self, fs_root, indexed_files):
+        scanned = []
+        for index, file_name in indexed_files:
+            result = run_argv(["file", "-b", file_name])
+            rpm = None
+            if "RPM" in result["output"]:
+                # fs_root gets a real copy as populate_mdata changes its mode
+                shutil.copy(file_name, fs_root)
+                _link_or_copy(file_name, self.tmp_repo_path)
+                rpm = Rpm()
+                rpm.populate_mdata(fs_root, os.path.basename(file_name), 
+                                   self.is_full_iso_require)
+            scanned.append((index, file_name, result["output"], rpm))
+        return scanned
+
     @staticmethod
     def sp_version_string_cmp(sp1, sp2):
         if (not sp1) and (not sp2):
@@ -874,26 +1248,26 @@ class Rpmdb:
         readiso(self.latest_sp_name, self.sp_mount_path)
 
         
-        sp_files = glob.glob(self.sp_mount_path+"/*")
+        sp_files = _scandir_paths(self.sp_mount_path)
         for sp_file in sp_files:
-            if "/host_rpms" in sp_file:
-                self.vm_sp_rpm_file_paths[HOST_SUBSTRING] = glob.glob(sp_file+"/*")
-            if "/calvados_rpms" in sp_file:
-                self.vm_sp_rpm_file_paths[CALVADOS_SUBSTRING] = glob.glob(sp_file+"/*")
-            if "/xr_rpms" in sp_file:
-                self.vm_sp_rpm_file_paths[XR_SUBSTRING] = glob.glob(sp_file+"/*")
-            if "/sp_info.txt" in sp_file:
+            sp_file_name = os.path.basename(sp_file)
+            if sp_file_name == "host_rpms":
+                self.vm_sp_rpm_file_paths[HOST_SUBSTRING] = _scandir_paths(sp_file)
+            elif sp_file_name == "calvados_rpms":
+                self.vm_sp_rpm_file_paths[CALVADOS_SUBSTRING] = _scandir_paths(sp_file)
+            elif sp_file_name == "xr_rpms":
+                self.vm_sp_rpm_file_paths[XR_SUBSTRING] = _scandir_paths(sp_file)
+            elif sp_file_name == "sp_info.txt":
                 self.sp_info = sp_file
 
-        if len(self.vm_sp_rpm_file_paths[HOST_SUBSTRING]) != 0:
-            logger.info("\nFollowing are the host rpms in service pack:\n")
-            list(map(lambda file_name: logger.info("\t(*) %s" % os.path.basename(file_name)), self.vm_sp_rpm_file_paths[HOST_SUBSTRING]))
-        if len(self.vm_sp_rpm_file_paths[CALVADOS_SUBSTRING]) != 0:
-            logger.info("\nFollowing are the cavados rpms in service pack:\n")
-            list(map(lambda file_name: logger.info("\t(*) %s" % os.path.basename(file_name)), self.vm_sp_rpm_file_paths[CALVADOS_SUBSTRING]))
-        if len(self.vm_sp_rpm_file_paths[XR_SUBSTRING]) != 0:
-            logger.info("\nFollowing are the xr rpms in service pack:\n")
-            list(map(lambda file_name: logger.info("\t(*) %s" % os.path.basename(file_name)), self.vm_sp_rpm_file_paths[XR_SUBSTRING]))
+        for vm_type, vm_name in ((HOST_SUBSTRING, "host"),
+                                 (CALVADOS_SUBSTRING, "cavados"),
+                                 (XR_SUBSTRING, "xr")):
+            if len(self.vm_sp_rpm_file_paths[vm_type]) != 0:
+                logger.info("\nFollowing are the %s rpms in service pack:\n"
+                            % vm_name)
+                _log_lines(logging.INFO, ("\t(*) %s" % os.path.basename(file_name)
+                                          for file_name in self.vm_sp_rpm_file_paths[vm_type]))
 
         return 0
 
@@ -918,16 +1292,21 @@ class Rpmdb:
     # Discard other rpms in the repository
     #
     def populate_tp_cisco_list(self, platform):
-        non_tp_cisco_rpms = set()
+        tp_cisco_rpms = []
+        non_tp_cisco_rpms = []
         for rpm in self.rpm_list:
             if rpm.is_tp_rpm(platform):
                 self.tp_rpm_list.append(rpm)
+                tp_cisco_rpms.append(rpm)
             elif rpm.is_cisco_rpm(platform):
                 self.csc_rpm_list.append(rpm)
+                tp_cisco_rpms.append(rpm)
             else:
-                non_tp_cisco_rpms |= set([rpm])
+                non_tp_cisco_rpms.append(rpm)
                 logger.debug("Skipping Non Cisco/Tp rpm %s" % rpm.file_name)
-        self.rpm_list = list(set(self.rpm_list)-non_tp_cisco_rpms)
+        # rpm_list holds no duplicates (see populate_rpmdb), so partitioning
+        # it keeps its order without going through a set
+        self.rpm_list = tp_cisco_rpms
         self.csc_rpm_count = len(self.csc_rpm_list)
         self.tp_rpm_count = len(self.tp_rpm_list)
         if non_tp_cisco_rpms: 
@@ -951,8 +1330,8 @@ class Rpmdb:
             logger.info("Skipped %s RPMS not matching version %s"
                         % (len(version_missmatch_rpms), release))
         logger.debug('Found %s Cisco RPMs' % self.csc_rpm_count)
-        list(map(lambda rpm_inst: logger.debug("\t\t%s" % rpm_inst.file_name),
-            self.csc_rpm_list))
+        _log_lines(logging.DEBUG, ("\t\t%s" % rpm_inst.file_name
+                                   for rpm_inst in self.csc_rpm_list))
 
         # filter TP SMUs based on XR release
         version_missmatch_tp_rpms = set()
@@ -967,8 +1346,8 @@ class Rpmdb:
             logger.info("Skipped %s TP RPMS not matching version %s"
                         % (len(version_missmatch_tp_rpms), release))
         logger.debug('Found %s TP RPMs' % self.tp_rpm_count)
-        list(map(lambda rpm_inst: logger.debug("\t\t%s" % rpm_inst.file_name),
-            self.tp_rpm_list))
+        _log_lines(logging.DEBUG, ("\t\t%s" % rpm_inst.file_name
+                                   for rpm_inst in self.tp_rpm_list))
     #
     # Filter and discard Cisco rpms not matching platform of mini ISO.
     #
@@ -986,8 +1365,8 @@ class Rpmdb:
             logger.info("Skipped %s RPMS not matching platform %s"
                         % (len(platform_missmatch_rpms), platform))
         logger.debug('Found %s Cisco RPMs' % self.csc_rpm_count)
-        list(map(lambda rpm_inst: logger.debug("\t\t%s" % rpm_inst.file_name),
-            self.csc_rpm_list))
+        _log_lines(logging.DEBUG, ("\t\t%s" % rpm_inst.file_name
+                                   for rpm_inst in self.csc_rpm_list))
         
         # filter TP SMUs based on platform
         platform_missmatch_tp_rpms = set()
@@ -1003,8 +1382,8 @@ class Rpmdb:
             logger.info("Skipped %s TP RPMS not matching platform %s"
                         % (len(platform_missmatch_tp_rpms), platform))
         logger.debug('Found %s TP RPMs' % self.csc_rpm_count)
-        list(map(lambda rpm_inst: logger.debug("\t\t%s" % rpm_inst.file_name),
-            self.csc_rpm_list))
+        _log_lines(logging.DEBUG, ("\t\t%s" % rpm_inst.file_name
+                                   for rpm_inst in self.csc_rpm_list))
         
     #
     # Filter and discard cnbng Cisco rpm if both bng and cnbng rpm present.
@@ -1028,8 +1407,8 @@ class Rpmdb:
                 for rpm in cnbng_rpms:
                     logger.info("\t(-) %s" % rpm.file_name)
             logger.debug('Found updated %s Cisco RPMs' % self.csc_rpm_count)
-            list(map(lambda rpm_inst: logger.debug("\t\t%s" % rpm_inst.file_name),
-                 self.csc_rpm_list))
+            _log_lines(logging.DEBUG, ("\t\t%s" % rpm_inst.file_name
+                                       for rpm_inst in self.csc_rpm_list))
 
     #
     # Read the content from release-rpms-*.txt and prepare list for each domain.
@@ -1066,13 +1445,9 @@ class Rpmdb:
                         for line in fdin.readlines():
                             sdk_rpm_filename = line.strip() 
                             if sdk_rpm_filename.endswith('.rpm'):
-                                mre = re.search(r'(.*)-(.*)-(.*)\.(.*)(\.rpm)', 
-                                                sdk_rpm_filename)
-                                if mre:
-                                    s_rpm_name = mre.groups()[0]
-                                    s_rpm_ver = mre.groups()[1]
-                                    s_rpm_rel = mre.groups()[2]
-                                    s_rpm_arch = mre.groups()[3]
+                                nvra = _split_rpm_file_name(sdk_rpm_filename)
+                                if nvra:
+                                    s_rpm_name, s_rpm_ver, s_rpm_rel, s_rpm_arch = nvra
 
                                     if s_rpm_arch not in self.all_arch_list:
                                         self.all_arch_list.append(s_rpm_arch)
@@ -1103,112 +1478,98 @@ class Rpmdb:
                  self.sdk_rpm_mdata[platform_key][vm_list[1]]
         logger.debug("SDK RPM metadata dictionary is created successfully")
                                 
+    #
+    # Index tp rpms by file name and by (name, vm, arch) for the base rpm
+    # lookups in get_tp_base_rpm. Rebuild whenever tp_rpm_list changes.
+    #
+    def index_tp_base_rpms(self):
+        self.tp_rpm_by_file_name = {}
+        self.tp_rpm_by_name_vm_arch = {}
+        for rpm in self.tp_rpm_list:
+            self.tp_rpm_by_file_name.setdefault(rpm.file_name, rpm)
+            if "CSC" in rpm.file_name:
+                continue
+            # vm type in rpm mdata is calvados where as in rpm
+            # filename it is admin
+            if rpm.vm_type.upper() == CALVADOS_SUBSTRING:
+                vmstr = ADMIN_SUBSTRING
+            else:
+                vmstr = rpm.vm_type.upper()
+            self.tp_rpm_by_name_vm_arch.setdefault((rpm.name, vmstr, rpm.arch),
+                                                   rpm)
+
     def get_tp_base_rpm(self, platform, vm, rpm_name):
         base_rpm_filename = ''
+        nvra = _split_rpm_file_name(rpm_name)
+        if not nvra:
+            return None
+        i_rpm_name, i_rpm_ver, i_rpm_rel, i_rpm_arch = nvra
         # vm = vm.lower()
         for sdk_arch in self.sdk_archs:
             # arm arch would not be available for xr vm
             if sdk_arch not in self.sdk_rpm_mdata[platform][vm]:
                 continue
-            for s_rpm_name in self.sdk_rpm_mdata[platform][vm][sdk_arch]:
-                mre = re.search(r'(.*)-(.*)-(.*)\.(.*)(\.rpm)', rpm_name)
-                if mre: 
-                    i_rpm_name = mre.groups()[0]
-                    i_rpm_ver = mre.groups()[1]
-                    # i_rpm_rel = mre.groups()[2]
-                    i_rpm_arch = mre.groups()[3]
-                    if i_rpm_name == s_rpm_name:
-                        base_rpm_arch = \
-                            list(self.sdk_rpm_mdata[platform][vm][sdk_arch][s_rpm_name].keys())[0]
-
-                        # same rpm name and same vm type may have
-                        # multiple rpm having different arch 
-                        # if arch atches then that is the correct base rpm
-
-                        if i_rpm_arch != base_rpm_arch:
-                            break
+            sdk_rpm = self.sdk_rpm_mdata[platform][vm][sdk_arch].get(i_rpm_name)
+            if sdk_rpm is None:
+                continue
+            base_rpm_arch = list(sdk_rpm.keys())[0]
 
-                        base_rpm_ver = \
-                            self.sdk_rpm_mdata[platform][vm][sdk_arch][s_rpm_name][base_rpm_arch][0]
-                        base_rpm_rel = \
-                            self.sdk_rpm_mdata[platform][vm][sdk_arch][s_rpm_name][base_rpm_arch][1]
-                 
-                        base_rpm_filename = '%s-%s-%s.%s.%s.%s' % (i_rpm_name,
-                                                                   base_rpm_ver,
-                                                                   base_rpm_rel,
-                                                                   vm.lower(),
-                                                                   base_rpm_arch,
-                                                                   "rpm")
-                        for rpm in self.tp_rpm_list:
-                            if base_rpm_filename == rpm.file_name and base_rpm_ver in i_rpm_ver:
-                                return rpm   
+            # same rpm name and same vm type may have
+            # multiple rpm having different arch 
+            # if arch atches then that is the correct base rpm
+            if i_rpm_arch != base_rpm_arch:
+                continue
+
+            base_rpm_ver = sdk_rpm[base_rpm_arch][0]
+            base_rpm_rel = sdk_rpm[base_rpm_arch][1]
+
+            base_rpm_filename = '%s-%s-%s.%s.%s.%s' % (i_rpm_name,
+                                                       base_rpm_ver,
+                                                       base_rpm_rel,
+                                                       vm.lower(),
+                                                       base_rpm_arch,
+                                                       "rpm")
+            rpm = self.tp_rpm_by_file_name.get(base_rpm_filename)
+            if rpm is not None and base_rpm_ver in i_rpm_ver:
+                return rpm
         if not base_rpm_filename:
-            for rpm in self.tp_rpm_list:
-                if rpm.vm_type.upper() == CALVADOS_SUBSTRING:
-                    vmstr="admin"
-                else:
-                    vmstr=rpm.vm_type
-                if (rpm.file_name.find("CSC") == -1) :
-                    if i_rpm_arch != rpm.arch:
-                        continue
-                    if vm != vmstr.upper():
-                        continue
-                    if i_rpm_name ==  rpm.name:
-                        logger.debug("Base rpm was calculated without thirdparty list\n")
-                        return rpm
-                    else:
-                        logger.debug("Didn't find base rpm\n")
-            return None 
+            rpm = self.tp_rpm_by_name_vm_arch.get((i_rpm_name, vm, i_rpm_arch))
+            if rpm is not None:
+                logger.debug("Base rpm was calculated without thirdparty list\n")
+                return rpm
+            logger.debug("Didn't find base rpm\n")
+        return None 
 
     # Find for any duplicate tp smu present in repo
     @staticmethod
     def find_duplicate_tp_smu(rpm_set):
 
-        duplicate_rpm_set = set()
-        seen_smu_dict = {}
-
         # If tp smus are built with all the metadata same except ddts id then
         # its not allowed and will throw error and exit
-        for rpm in rpm_set:
-            if rpm.package_type.upper() == SMU_SUBSTRING:
-                smu_nva = "%s-%s-%s" % (rpm.name, rpm.version, rpm.arch)
-                if smu_nva in seen_smu_dict:
-                    duplicate_rpm_set.add(seen_smu_dict[smu_nva])
-                    duplicate_rpm_set.add(rpm)
-                else:
-                    seen_smu_dict[smu_nva] = rpm
+        smu_rpms = [rpm for rpm in rpm_set
+                    if rpm.package_type.upper() == SMU_SUBSTRING]
+        smu_nva_count = Counter((rpm.name, rpm.version, rpm.arch)
+                                for rpm in smu_rpms)
 
-        return duplicate_rpm_set
+        return set(rpm for rpm in smu_rpms
+                   if smu_nva_count[(rpm.name, rpm.version, rpm.arch)] > 1)
 
     # Check and throw error for any duplicate tp smu present 
     def check_all_tp_duplicate_smu(self, host_rpm_set, admin_rpm_set, xr_rpm_set):
-        duplicate_tp_host_rpm = set()
-        duplicate_tp_admin_rpm = set()
-        duplicate_tp_xr_rpm = set()
-        rc = 0
+        found_duplicate = False
 
-        if host_rpm_set:
-            duplicate_tp_host_rpm = Rpmdb.find_duplicate_tp_smu(host_rpm_set)
-        if admin_rpm_set:
-            duplicate_tp_admin_rpm = Rpmdb.find_duplicate_tp_smu(admin_rpm_set)
-        if xr_rpm_set:
-            duplicate_tp_xr_rpm = Rpmdb.find_duplicate_tp_smu(xr_rpm_set)
-
-        if len(duplicate_tp_host_rpm) != 0:
-            logger.error("\nFollowing are the duplicate host tp smus:\n")
-            list(map(lambda rpm_inst: logger.info("\t(*) %s" % rpm_inst.file_name), 
-                duplicate_tp_host_rpm))
-        if len(duplicate_tp_admin_rpm) != 0:
-            logger.error("\nFollowing are the duplicate admin tp smus:\n")
-            list(map(lambda rpm_inst: logger.info("\t(*) %s" % rpm_inst.file_name), 
-                duplicate_tp_admin_rpm))
-        if len(duplicate_tp_xr_rpm) != 0:
-            logger.error("\nFollowing are the duplicate xr tp smus:\n")
-            list(map(lambda rpm_inst: logger.info("\t(*) %s" % rpm_inst.file_name), 
-                duplicate_tp_xr_rpm))
-
-        if (len(duplicate_tp_host_rpm) != 0 or len(duplicate_tp_admin_rpm) != 0  
-            or len(duplicate_tp_xr_rpm) != 0):
+        for vm, rpm_set in (("host", host_rpm_set), ("admin", admin_rpm_set),
+                            ("xr", xr_rpm_set)):
+            if not rpm_set:
+                continue
+            duplicate_tp_rpm = Rpmdb.find_duplicate_tp_smu(rpm_set)
+            if duplicate_tp_rpm:
+                found_duplicate = True
+                logger.error("\nFollowing are the duplicate %s tp smus:\n" % vm)
+                _log_lines(logging.INFO, ("\t(*) %s" % rpm_inst.file_name
+                                          for rpm_inst in duplicate_tp_rpm))
+
+        if found_duplicate:
             logger.info("\nThere are multiple TP SMU(s) for same package "
                         "and same version,\nPlease make sure that single "
                         "version per package present in repo.")
@@ -1230,6 +1591,7 @@ class Rpmdb:
 
         self.populate_tp_rpmdb_from_sdk_release_file(platform_key, 
                                                      iso_mount_path)
+        self.index_tp_base_rpms()
 
         # If name, relase and arch of the given tp rpm matches to the rpms
         # present in the release-rpms*.txt then its a valid rpm
@@ -1279,22 +1641,22 @@ class Rpmdb:
             logger.info("\nBase rpm(s) of following %s Thirdparty Host SMU(s) "
                         "is/are not present in the repository.\n" % 
                         len(invalid_tp_host_rpm)) 
-            list(map(lambda rpm_inst: logger.info("\t-->%s" % rpm_inst.file_name), 
-                invalid_tp_host_rpm))
+            _log_lines(logging.INFO, ("\t-->%s" % rpm_inst.file_name
+                                      for rpm_inst in invalid_tp_host_rpm))
             rc = -1
         if len(invalid_tp_admin_rpm):
             logger.info("\nBase rpm(s) of following %d Thirdparty Sysadmin SMU(s) "
                         "is/are not present in the repository.\n" % 
                         len(invalid_tp_admin_rpm)) 
-            list(map(lambda rpm_inst: logger.info("\t-->%s" % rpm_inst.file_name), 
-                invalid_tp_admin_rpm))
+            _log_lines(logging.INFO, ("\t-->%s" % rpm_inst.file_name
+                                      for rpm_inst in invalid_tp_admin_rpm))
             rc = -1
         if len(invalid_tp_xr_rpm):
             logger.info("\nBase rpm(s) of following %d Thirdparty Xr SMU(s) "
                         "is/are not present in the repository.\n" % 
                         len(invalid_tp_xr_rpm)) 
-            list(map(lambda rpm_inst: logger.info("\t-->%s" % rpm_inst.file_name), 
-                invalid_tp_xr_rpm))
+            _log_lines(logging.INFO, ("\t-->%s" % rpm_inst.file_name
+                                      for rpm_inst in invalid_tp_xr_rpm))
             rc = -1
 
         if rc != 0:
@@ -1327,20 +1689,20 @@ class Rpmdb:
             logger.info("Skipping following %s Thirdparty RPM(s) not supported\n" 
                         "for release %s:\n" % 
                         (len(invalid_tp_rpm_list), iso_version))
-            list(map(lambda rpm_inst: logger.info("\t\t(-) %s" % rpm_inst.file_name), 
-                invalid_tp_rpm_list))
+            _log_lines(logging.INFO, ("\t\t(-) %s" % rpm_inst.file_name
+                                      for rpm_inst in invalid_tp_rpm_list))
             logger.info("If any of the above %s RPM(s) needed for Golden ISO then\n"
                         "provide RPM(s) supported for release %s" % 
                         (len(invalid_tp_rpm_list), iso_version))
 
         if superseded_tp_smu_list:
             logger.debug("Skipping following superseded Thirdparty SMU(s)\n")
-            list(map(lambda rpm_inst: logger.debug("\t\t%s" % rpm_inst.file_name),
-                superseded_tp_smu_list))
+            _log_lines(logging.DEBUG, ("\t\t%s" % rpm_inst.file_name
+                                       for rpm_inst in superseded_tp_smu_list))
 
         logger.debug('Found %s TP RPMs' % self.tp_rpm_count)
-        list(map(lambda rpm_inst: logger.debug("\t\t%s" % rpm_inst.file_name), 
-            self.tp_rpm_list))
+        _log_lines(logging.DEBUG, ("\t\t%s" % rpm_inst.file_name
+                                   for rpm_inst in self.tp_rpm_list))
 
     def filter_tp_rpms_by_supported_arch(self, iso_mount_path: pathlib.Path, iso_version: str):
         """
@@ -1439,7 +1801,7 @@ class Rpmdb:
             assert img_mdata.exists()
             with img_mdata.open('r') as f_mdata:
                 try:
-                    mdata = yaml.safe_load(f_mdata)
+                    mdata = yaml.load(f_mdata, Loader=_YAML_LOADER)
                     return Supported_Arch(
                         arm=mdata["arm supported arch list"].split(' '),
                         x86_64=mdata["x86_64 supported arch list"].split(' ')
@@ -1494,26 +1856,29 @@ class Rpmdb:
         self.tp_rpm_list = [tp_rpm for tp_rpm in validated_tp_rpms]
         self.tp_rpm_count = len(validated_tp_rpms) # TODO: make tp_rpm_count a property
         logger.info(f"{self.tp_rpm_count} valid TP Rpms:")
-        list(map(lambda rpm: logger.info(f"\t\t{rpm.file_name}"), validated_tp_rpms))
+        _log_lines(logging.INFO, (f"\t\t{rpm.file_name}"
+                                  for rpm in validated_tp_rpms))
         
         if len(skipped_unsupp_arch_rpms) > 0:
             logger.info("Skipping the following TP rpms as the architecture is not supported:")
-            list(map(lambda rpm: logger.info(f"\t\t{rpm.rpm_name}"), skipped_unsupp_arch_rpms))
+            _log_lines(logging.INFO, (f"\t\t{rpm.rpm_name}"
+                                      for rpm in skipped_unsupp_arch_rpms))
         
         if len(skipped_release_mismatch_rpms) > 0:
             logger.info("Skipping the following TP rpms as the release doesn't match with the iso:")
-            list(map(lambda rpm: logger.info(f"\t\t{rpm.rpm_name}"), skipped_release_mismatch_rpms))
+            _log_lines(logging.INFO, (f"\t\t{rpm.rpm_name}"
+                                      for rpm in skipped_release_mismatch_rpms))
         if len(skipped_base_vm_missing_rpms.keys()) > 0:
             logger.info("Skipping the following beacuse of unmet dependencies:")
             for skipped_rpm, deps in skipped_base_vm_missing_rpms.items():
                 logger.info(f"\t{skipped_rpm.rpm_name}:")
-                list(map(lambda rpm: logger.info(f"\t\t{rpm}"), deps))
+                _log_lines(logging.INFO, (f"\t\t{rpm}" for rpm in deps))
     # Remove superseded tp smu present in the list
     @staticmethod
     def find_superseded_tp_smu(rpm_set):
 
         superseded_tp_rpm_set = set()
-        highest_ver_seen_smu_dict = {}
+        smu_by_na = defaultdict(list)
 
         # TP smus of same package get built with different version
         # than previous one. running number will be incremeneted after .p[n]
@@ -1521,15 +1886,12 @@ class Rpmdb:
         # cisco-klm-0.1.p2-r0.0.r663.CSCvv27341.admin.x86_64.rpm
         for rpm in rpm_set:
             if rpm.package_type.upper() == SMU_SUBSTRING:
-                smu_na = "%s-%s" % (rpm.name, rpm.arch)
-                if smu_na in highest_ver_seen_smu_dict:
-                    if highest_ver_seen_smu_dict[smu_na].version < rpm.version:
-                        superseded_tp_rpm_set.add(highest_ver_seen_smu_dict[smu_na])
-                        highest_ver_seen_smu_dict[smu_na] = rpm
-                    else:
-                        superseded_tp_rpm_set.add(rpm)
-                else:
-                    highest_ver_seen_smu_dict[smu_na] = rpm
+                smu_by_na[(rpm.name, rpm.arch)].append(rpm)
+
+        for smu_group in smu_by_na.values():
+            latest_smu = max(smu_group, key=Rpm.get_ver_key)
+            superseded_tp_rpm_set.update(rpm for rpm in smu_group
+                                         if rpm is not latest_smu)
 
         return superseded_tp_rpm_set
 
@@ -1553,11 +1915,27 @@ class Rpmdb:
 
         return all_superseded_tp_rpm
 
+    #
+    # Drop the given rpms from csc_rpm_list and rpm_list in one pass over
+    # each list. Rpm compares by identity, so a set lookup is exact.
+    #
+    def discard_cisco_rpms(self, rpms):
+        if not rpms:
+            return
+        discarded = set(rpms)
+        self.csc_rpm_list = [x for x in self.csc_rpm_list if x not in discarded]
+        self.rpm_list = [x for x in self.rpm_list if x not in discarded]
+
     def filter_hostos_spirit_boot_base_rpms(self, platform):
-        all_hostos_base_rpms = [x for x in self.csc_rpm_list if x.is_hostos_rpm(platform) and
-                                x.package_type.upper() != SMU_SUBSTRING]
-        all_spirit_boot_base_rpms = [x for x in self.csc_rpm_list if x.is_spiritboot() and 
-                                     x.package_type.upper() != SMU_SUBSTRING]
+        all_hostos_base_rpms = []
+        all_spirit_boot_base_rpms = []
+        for x in self.csc_rpm_list:
+            if x.package_type.upper() == SMU_SUBSTRING:
+                continue
+            if x.is_hostos_rpm(platform):
+                all_hostos_base_rpms.append(x)
+            elif x.is_spiritboot():
+                all_spirit_boot_base_rpms.append(x)
 
         if len(all_hostos_base_rpms):
             logger.info("\nSkipping following host os base rpm(s) "
@@ -1565,131 +1943,70 @@ class Rpmdb:
             for rpm in all_hostos_base_rpms:    
                 logger.info("\t(-) %s" % rpm.file_name)
 
-        list(map(self.csc_rpm_list.remove, all_hostos_base_rpms))
-        list(map(self.rpm_list.remove, all_hostos_base_rpms))
-
         if len(all_spirit_boot_base_rpms):
             logger.info("\nSkipping following spirit-boot base rpm(s) "
                         "from repository:\n")
             for rpm in all_spirit_boot_base_rpms:    
                 logger.info("\t(-) %s" % rpm.file_name)
-        list(map(self.csc_rpm_list.remove, all_spirit_boot_base_rpms))
-        list(map(self.rpm_list.remove, all_spirit_boot_base_rpms))
-
-    def _iter_rpm_subfields(self, field):
-        """Yield subfields as 2-tuples that sort in the desired order
-
-        Text subfields are yielded as (0, text_value)
-        Numeric subfields are yielded as (1, int_value)
-        """
-        for subfield in _subfield_pattern.finditer(field):
-            text = subfield.group('text')
-            if text is not None:
-                yield (0, text)
-            else:
-                yield (1, int(subfield.group('num')))
-
-    def _compare_rpm_field(self, lhs, rhs):
-        # Short circuit for exact matches (including both being None)
-        if lhs == rhs:
-            return 0
-        # Otherwise assume both inputs are strings
-        lhs_subfields = self._iter_rpm_subfields(lhs)
-        rhs_subfields = self._iter_rpm_subfields(rhs)
-        for lhs_sf, rhs_sf in zip_longest(lhs_subfields, rhs_subfields):
-            if lhs_sf == rhs_sf:
-                # When both subfields are the same, move to next subfield
-                continue
-            if lhs_sf is None:
-                # Fewer subfields in LHS, so it's less than/older than RHS
-                return -1
-            if rhs_sf is None:
-                # More subfields in LHS, so it's greater than/newer than RHS
-                return 1
-            # Found a differing subfield, so it determines the relative order
-            return -1 if lhs_sf < rhs_sf else 1
-        # No relevant differences found between LHS and RHS
-        return 0
-
-    def _compare_rpm_labels(self, lhs, rhs):
-        lhs_epoch, lhs_version, lhs_release = lhs
-        rhs_epoch, rhs_version, rhs_release = rhs
-        result = self._compare_rpm_field(lhs_epoch, rhs_epoch)
-        if result:
-            return result
-        result = self._compare_rpm_field(lhs_version, rhs_version)
-        if result:
-            return result
-        return self._compare_rpm_field(lhs_release, rhs_release)
+        self.discard_cisco_rpms(all_hostos_base_rpms + all_spirit_boot_base_rpms)
 
     def filter_superseded_rpms(self):
         count = 0
-        latest_smu = {}
+        smu_groups = defaultdict(list)
         for pkg in self.csc_rpm_list :
             count = count + 1
-            logger.info("[%2d] %s "%(count,pkg.file_name))
-            key = "%s.%s.%s.%s"%(pkg.name, pkg.package_type, pkg.arch, pkg.vm_type)
-            if key in latest_smu:
-                p_v = latest_smu[key].version
-                p_r = latest_smu[key].release
-                t_v = pkg.version
-                t_r = pkg.release
-                if self._compare_rpm_labels([0,p_v,p_r],[0,t_v,t_r]) < 0 :
-                    latest_smu[key] = pkg
-            else :
-                latest_smu[key] = pkg
+            logger.info("[%2d] %s ", count, pkg.file_name)
+            smu_groups[(pkg.name, pkg.package_type, pkg.arch,
+                        pkg.vm_type)].append(pkg)
 
         for pkg in self.tp_rpm_list :
             count = count + 1
-            logger.info("[%2d] %s "%(count,pkg.file_name))
+            logger.info("[%2d] %s ", count, pkg.file_name)
 
-        self.csc_rpm_list = [ latest_smu[key] for key in list(latest_smu.keys()) ]
+        # max() keeps the first of equally versioned rpms, as before
+        self.csc_rpm_list = [max(smu_group, key=Rpm.get_label_key)
+                             for smu_group in smu_groups.values()]
 
 
     def validate_associate_hostos_rpms(self, all_hostos_rpms):
+        hostos_file_names = set()
+        host_hostos_rpms = []
+        admin_hostos_rpms = []
         for rpm in all_hostos_rpms:
-            associate_rpm_present = False
-            if rpm.vm_type.upper() == HOST_SUBSTRING:
-                asso_rel = rpm.release.replace(HOST_SUBSTRING.lower(), ADMIN_SUBSTRING.lower())
-                associate_rpm = '%s-%s-%s.%s.%s' % (rpm.name, rpm.version, asso_rel, rpm.arch, "rpm")
-                for rpm1 in all_hostos_rpms:
-                    if rpm1.file_name == associate_rpm:
-                        associate_rpm_present = True
-                        break
-                if not associate_rpm_present:
-                    logger.error("Error: Hostos rpms are used together for host and syadmin vm")
-                    logger.error("Error: Missing hostos rpm for syadamin is %s" % (associate_rpm))
-                    sys.exit(-1)
-                else:
-                    break
-        for rpm in all_hostos_rpms:
-            associate_rpm_present = False
-            if rpm.vm_type.upper() == CALVADOS_SUBSTRING:
-                asso_rel = rpm.release.replace(ADMIN_SUBSTRING.lower(), HOST_SUBSTRING.lower())
-                associate_rpm = '%s-%s-%s.%s.%s' % (rpm.name, rpm.version, asso_rel, rpm.arch, "rpm")
-                for rpm1 in all_hostos_rpms:
-                    if rpm1.file_name == associate_rpm:
-                        associate_rpm_present = True
-                        break
-                if not associate_rpm_present:
+            hostos_file_names.add(rpm.file_name)
+            vm_type = rpm.vm_type.upper()
+            if vm_type == HOST_SUBSTRING:
+                host_hostos_rpms.append(rpm)
+            elif vm_type == CALVADOS_SUBSTRING:
+                admin_hostos_rpms.append(rpm)
+
+        host_str = HOST_SUBSTRING.lower()
+        admin_str = ADMIN_SUBSTRING.lower()
+        associate_rpm_fmt = '%s-%s-%s.%s.rpm'
+        # Each host rpm needs its sysadmin associate and vice versa, stop at
+        # the first rpm whose associate is missing
+        for rpms, from_str, to_str, vm_name in (
+                (host_hostos_rpms, host_str, admin_str, "syadamin"),
+                (admin_hostos_rpms, admin_str, host_str, "host")):
+            for rpm in rpms:
+                associate_rpm = associate_rpm_fmt % (rpm.name, rpm.version,
+                                    rpm.release.replace(from_str, to_str),
+                                    rpm.arch)
+                if associate_rpm not in hostos_file_names:
                     logger.error("Error: Hostos rpms are used together for host and syadmin vm")
-                    logger.error("Error: Missing hostos rpm for host is %s" % (associate_rpm))
+                    logger.error("Error: Missing hostos rpm for %s is %s" % (vm_name, associate_rpm))
                     sys.exit(-1)
-                else:
-                    break
 
+    #
+    # Return the rpms not at the newest version present in rpms. Only the
+    # newest version is needed, so a single max() pass replaces a sort.
+    #
     @staticmethod
-    def rpm_version_string_cmp(rpm1, rpm2):
-        if (not rpm1) and (not rpm2):
-            return 0
-        ilist1 = list(map(int, rpm1.version.split('.')))
-        ilist2 = list(map(int, rpm2.version.split('.')))
-        if ilist1 > ilist2:
-            return -1
-        elif ilist1 < ilist2:
-            return 1
-        else:
-            return 0
+    def get_older_version_rpms(rpms):
+        if not rpms:
+            return []
+        latest_version = max(rpms, key=Rpm.get_ver_key).version
+        return [x for x in rpms if x.version != latest_version]
 
     def filter_multiple_hostos_spirit_boot_rpms(self, platform):
         self.filter_hostos_spirit_boot_base_rpms(platform)
@@ -1699,32 +2016,23 @@ class Rpmdb:
 
         self.validate_associate_hostos_rpms(all_hostos_rpms)
  
-        sorted_hostos_rpms = \
-            sorted(all_hostos_rpms,   
-                   key=functools.cmp_to_key(Rpmdb.rpm_version_string_cmp))
-        discarded_hostos_rpms = \
-            [x for x in sorted_hostos_rpms if sorted_hostos_rpms[0].version != x.version]
+        discarded_hostos_rpms = Rpmdb.get_older_version_rpms(all_hostos_rpms)
 
         if len(discarded_hostos_rpms):
             logger.info("\nSkipping following older version of host os rpm(s) from repository:\n")
             for rpm in discarded_hostos_rpms:    
                 logger.info("\t(-) %s" % rpm.file_name)
 
-        list(map(self.csc_rpm_list.remove, discarded_hostos_rpms))
-        list(map(self.rpm_list.remove, discarded_hostos_rpms))
+        self.discard_cisco_rpms(discarded_hostos_rpms)
 
-        sorted_spiritboot = \
-            sorted(all_spirit_boot_rpms,
-                   key=functools.cmp_to_key(Rpmdb.rpm_version_string_cmp))
         discarded_spiritboot_rpms = \
-            [x for x in sorted_spiritboot if sorted_spiritboot[0].version != x.version]
+            Rpmdb.get_older_version_rpms(all_spirit_boot_rpms)
 
         if len(discarded_spiritboot_rpms):
             logger.info("\nSkipping following older version of spirit-boot rpm(s) from repository:\n")
             for rpm in discarded_spiritboot_rpms:
                 logger.info("\t(-) %s" % rpm.file_name)
-        list(map(self.csc_rpm_list.remove, discarded_spiritboot_rpms))
-        list(map(self.rpm_list.remove, discarded_spiritboot_rpms))
+        self.discard_cisco_rpms(discarded_spiritboot_rpms)
             
     #
     # Group Cisco rpms based on VM_type and Architecture
@@ -1732,11 +2040,7 @@ class Rpmdb:
     #
     def group_cisco_rpms_by_vm_arch(self):
         for rpm in self.csc_rpm_list:
-            arch_rpms = self.csc_rpms_by_vm_arch[rpm.vm_type.upper()]
-            if not (rpm.arch in list(arch_rpms.keys())):
-                arch_rpms[rpm.arch] = [rpm]
-            else:
-                arch_rpms[rpm.arch].append(rpm)
+            self.csc_rpms_by_vm_arch[rpm.vm_type.upper()][rpm.arch].append(rpm)
     #
     # Group ThirdParty rpms based on VM_type and Architecture
     # {"HOST":{},"CALVADOS":{},"XR":{}}
@@ -1744,11 +2048,7 @@ class Rpmdb:
 
     def group_tp_rpms_by_vm_arch(self):
         for rpm in self.tp_rpm_list:
-            arch_rpms = self.tp_rpms_by_vm_arch[rpm.vm_type.upper()]
-            if not (rpm.arch in list(arch_rpms.keys())):
-                arch_rpms[rpm.arch] = [rpm]
-            else:
-                arch_rpms[rpm.arch].append(rpm)
+            self.tp_rpms_by_vm_arch[rpm.vm_type.upper()][rpm.arch].append(rpm)
     #########################################
     # Getter api's
     #########################################
@@ -1774,18 +2074,10 @@ class Rpmdb:
                 return "%s/%s" % (repo_path, rpm.file_name)
 
     def get_tp_rpms_by_vm_arch(self, vm_type, arch):
-        if not (vm_type in list(self.tp_rpms_by_vm_arch.keys())):
-            return []
-        if not (arch in list(self.tp_rpms_by_vm_arch[vm_type].keys())):
-            return []
-        return self.tp_rpms_by_vm_arch[vm_type][arch]
+        return self.tp_rpms_by_vm_arch.get(vm_type, {}).get(arch, [])
 
     def get_cisco_rpms_by_vm_arch(self, vm_type, arch):
-        if not (vm_type in list(self.csc_rpms_by_vm_arch.keys())):
-            return []
-        if not (arch in list(self.csc_rpms_by_vm_arch[vm_type].keys())):
-            return []
-        return self.csc_rpms_by_vm_arch[vm_type][arch] 
+        return self.csc_rpms_by_vm_arch.get(vm_type, {}).get(arch, []) 
 
     def get_sp_mount_path(self): 
         return self.sp_mount_path
@@ -1799,73 +2091,62 @@ class Rpmdb:
     def get_missing_arch_rpm(self, vm_type, supp_arch, multi_arch_supported=False):
         missing_cisco_rpm_list = {}
         missing_tp_rpm_list = {}
-        temp_missing_tp_rpm_list = {} 
         missing_rpm_list = {}
-        arch_rpm_name_version = {}
-        all_rpms = []
+        arch_rpm_nvr = {}
+        all_rpms = set()
         platform_key = 'platform'
 
+        # rpms are tracked as (name, version, release) tuples
         for arch in supp_arch:
-            arch_rpm_name_version[arch] = []
-            for rpm2 in self.get_cisco_rpms_by_vm_arch(vm_type, arch):
-                arch_rpm_name_version[arch].append("%s-%s-%s"
-                                                   % (rpm2.name, rpm2.version, 
-                                                      rpm2.release))
-            all_rpms.extend(arch_rpm_name_version[arch])
-        all_rpms = list(set(all_rpms))
+            arch_rpm_nvr[arch] = set((rpm2.name, rpm2.version, rpm2.release)
+                                     for rpm2 in
+                                     self.get_cisco_rpms_by_vm_arch(vm_type, arch))
+            all_rpms |= arch_rpm_nvr[arch]
         for arch in supp_arch:
-            missing_cisco_rpm_list[arch] = list(set(all_rpms) - 
-                                          set(arch_rpm_name_version[arch]))
+            missing_cisco_rpm_list[arch] = all_rpms - arch_rpm_nvr[arch]
 
         if not multi_arch_supported:
-            all_rpms = []
-            arch_rpm_name_version = {}
+            all_rpms = set()
+            arch_rpm_nvr = {}
             for arch in supp_arch:
-                arch_rpm_name_version[arch] = []
-                for rpm2 in self.get_tp_rpms_by_vm_arch(vm_type, arch):
-                    arch_rpm_name_version[arch].append("%s-%s-%s"
-                                                    % (rpm2.name, rpm2.version, 
-                                                        rpm2.release))
-                all_rpms.extend(arch_rpm_name_version[arch])
-            all_rpms = list(set(all_rpms))
+                arch_rpm_nvr[arch] = set((rpm2.name, rpm2.version, rpm2.release)
+                                         for rpm2 in
+                                         self.get_tp_rpms_by_vm_arch(vm_type, arch))
+                all_rpms |= arch_rpm_nvr[arch]
             for arch in supp_arch:
-                missing_tp_rpm_list[arch] = list(set(all_rpms) - 
-                                            set(arch_rpm_name_version[arch]))
-                temp_missing_tp_rpm_list[arch] = missing_tp_rpm_list[arch][:]  
+                missing_tp_rpm_list[arch] = all_rpms - arch_rpm_nvr[arch]
 
             # tp rpms may be released for only one arch card. so need to validate
             # from sdk metadata whether its a real missing or virtual mising
+            self.index_tp_base_rpms()
             for arch in supp_arch:
-                for rpm_nvr in temp_missing_tp_rpm_list[arch]:
-                    mre = re.search(r'(.*)-(.*)-(.*)', rpm_nvr)
-                    rpm_name = "%s.%s.%s" % (rpm_nvr, arch, "rpm")
-                    if mre:
-                        tp_rpm_name = mre.groups()[0]
-                        tp_rpm_ver = mre.groups()[1]
-                        tp_rpm_rel = mre.groups()[2]
-                        tp_rpm_arch = arch 
-                        if tp_rpm_rel.upper().endswith(ADMIN_SUBSTRING):
-                            base_rpm = self.get_tp_base_rpm(platform_key, 
-                                                            ADMIN_SUBSTRING,
-                                                            rpm_name)
-                            if base_rpm is None:
-                                logger.debug("Admin tp rpm %s is invalid\n" % rpm_name) 
-                                missing_tp_rpm_list[arch].remove(rpm_nvr)
-
-                        if tp_rpm_rel.upper().endswith(HOST_SUBSTRING):
-                            base_rpm = self.get_tp_base_rpm(platform_key, 
-                                                            HOST_SUBSTRING,
-                                                            rpm_name)
-                            if base_rpm is None:
-                                logger.debug("Host tp rpm %s is invalid\n" % rpm_name) 
-                                missing_tp_rpm_list[arch].remove(rpm_nvr)
+                for rpm_nvr in list(missing_tp_rpm_list[arch]):
+                    tp_rpm_name, tp_rpm_ver, tp_rpm_rel = rpm_nvr
+                    rpm_name = "%s-%s-%s.%s.%s" % (tp_rpm_name, tp_rpm_ver,
+                                                   tp_rpm_rel, arch, "rpm")
+                    if tp_rpm_rel.upper().endswith(ADMIN_SUBSTRING):
+                        base_rpm = self.get_tp_base_rpm(platform_key, 
+                                                        ADMIN_SUBSTRING,
+                                                        rpm_name)
+                        if base_rpm is None:
+                            logger.debug("Admin tp rpm %s is invalid\n" % rpm_name) 
+                            missing_tp_rpm_list[arch].discard(rpm_nvr)
+
+                    if tp_rpm_rel.upper().endswith(HOST_SUBSTRING):
+                        base_rpm = self.get_tp_base_rpm(platform_key, 
+                                                        HOST_SUBSTRING,
+                                                        rpm_name)
+                        if base_rpm is None:
+                            logger.debug("Host tp rpm %s is invalid\n" % rpm_name) 
+                            missing_tp_rpm_list[arch].discard(rpm_nvr)
       
         for arch in supp_arch:
             if not multi_arch_supported:
-                missing_rpm_list[arch] = list(set(missing_cisco_rpm_list[arch]) | 
-                                          set(missing_tp_rpm_list[arch]))
+                missing_nvr = missing_cisco_rpm_list[arch] | missing_tp_rpm_list[arch]
             else:
-                missing_rpm_list[arch] = list(set(missing_cisco_rpm_list[arch]))
+                missing_nvr = missing_cisco_rpm_list[arch]
+            missing_rpm_list[arch] = ["%s-%s-%s" % rpm_nvr
+                                      for rpm_nvr in missing_nvr]
         return missing_rpm_list
 
     def get_sp_info(self):
@@ -1876,10 +2157,6 @@ def system_resource_check(args):
     tools = ['mount', 'rm', 'cp', 'umount', 'zcat', 'chroot', 'mkisofs']
     logger.debug("\nPerforming System requirements check...")
 
-    if sys.version_info < (2, 7):
-        logger.error("Error: This tool requires Python version 2.7 or higher.")
-        sys.exit(-1)
-        
     disk = os.statvfs(cwd)
     total_avail_space = float(disk.f_bavail*disk.f_frsize)
     total_avail_space_gb = total_avail_space/1024/1024/1024
@@ -1894,12 +2171,7 @@ def system_resource_check(args):
     if args.fullISO:
         tools.remove('chroot')
     for tool in tools:
-        try:
-            run_cmd("which %s" % tool)
-        except Exception:
-            exc_info = sys.exc_info()
-            logger.debug("TB:", exc_info=True)
-            print("\n", "Exception:", exc_info[0], exc_info[1])
+        if shutil.which(tool) is None:
             logger.error("\tError: Tool %s not found." % tool)
             rc = -1
             
@@ -1958,15 +2230,14 @@ class Iso(object):
         self.iso_mount_path = tempfile.mkdtemp(dir=pwd)      
         self.com_iso_mount_path = tempfile.mkdtemp(dir=pwd)      
         readiso(self.iso_path, self.iso_mount_path)
-        iso_info_file = open("%s/%s" % (self.iso_mount_path, Iso.ISO_INFO_FILE),
-                             'r')
-        iso_info_raw = iso_info_file.read()
-        self.iso_name = iso_info_raw[iso_info_raw.find("Name:"):].split(" ")[1]
+        iso_info = {}
+        with open("%s/%s" % (self.iso_mount_path, Iso.ISO_INFO_FILE), 'r') as f:
+            for m in _ISO_INFO_FIELD_RE.finditer(f.read()):
+                iso_info.setdefault(m.group(1), m.group(2))
+        self.iso_name = iso_info["Name"]
         self.iso_platform_name = self.iso_name.split("-")[0] 
-        self.iso_version = \
-            iso_info_raw[iso_info_raw.find("Version:"):].split(" ")[1]
-        self.iso_pkg_fmt_ver = \
-            iso_info_raw[iso_info_raw.find("PKG_FORMAT_VER:"):].split(" ")[1]
+        self.iso_version = iso_info["Version"]
+        self.iso_pkg_fmt_ver = iso_info["PKG_FORMAT_VER"]
         self.iso_rpms = glob.glob('%s/rpm/*/*' % self.iso_mount_path)
         if self.iso_pkg_fmt_ver >= "1.2":
             self.create_com_iso_path(self.iso_path)
@@ -1977,8 +2248,6 @@ class Iso(object):
             else:
                 self.com_iso_path = None
                 #print "self.com_iso_path = %s is not valid " % self.com_iso_path
-            
-        iso_info_file.close()
 
         #Copy matrix files from the XR ISO to the extraction path 
         src_mpath = os.path.join(self.iso_mount_path, "upgrade_matrix")
@@ -1986,7 +2255,7 @@ class Iso(object):
         if os.path.exists(src_mpath):
             try: 
                 shutil.copytree(src_mpath, dst_mpath)
-                run_cmd("chmod 644 %s/*" % (dst_mpath))
+                run_cmd_silent("chmod 644 %s/*" % (dst_mpath))
                 self.matrix_extract_path = dst_mpath
             except:
                 pass
@@ -2033,7 +2302,7 @@ class Iso(object):
                     logger.debug("CPIO file present : %s" % cpio_file[0])
                     # copy for nested giso where shrinked mini iso is used
                     self.shrinked_iso_extract_path = tempfile.mkdtemp(dir=pwd)
-                    run_cmd("cp -fr %s/* %s " % (self.iso_extract_path, self.shrinked_iso_extract_path))
+                    run_cmd_silent("cp -fr %s/* %s " % (self.iso_extract_path, self.shrinked_iso_extract_path))
                     pwd1 = os.getcwd()
                     cpioext = tempfile.mkdtemp(dir=pwd1)
                     os.chdir(cpioext)
@@ -2043,12 +2312,12 @@ class Iso(object):
                     os.chdir(pwd1)
                     run_cmd("zcat -f %s%s | cpio -idu" % (cpioext,
                         Iso.ISO_INITRD_RPATH))
-                run_cmd("chmod -R 777 ./")
+                _chmod_tree(self.iso_extract_path, 0o777)
                 os.chdir(pwd)
             else:
                 logger.error("Error: Couldn't create directory for extarcting initrd")
                 sys.exit(-1)
-        run_cmd('touch %s/etc/mtab' % self.iso_extract_path)
+        pathlib.Path(self.iso_extract_path, 'etc', 'mtab').touch()
         logger.debug("ISO %s extract path %s" % (self.iso_name, 
                                                  self.iso_extract_path))
         return self.iso_extract_path
@@ -2059,6 +2328,27 @@ class Iso(object):
     def get_matrix_extract_path(self):
         return self.matrix_extract_path
 
+    #
+    # Extract the compatibility matrix files carried by an infra or
+    # iosxr-install SMU and copy them to the matrix extract path.
+    #
+    # Extract the matrix files of rpm into a private temp dir under
+    # extract_dir and return the paths of the extracted json files. The
+    # caller copies them into matrix_extract_path and removes the temp dir.
+    def extract_matrix_files(self, rpm, extract_dir):
+        rpm_extract_dir = tempfile.mkdtemp(dir=extract_dir)
+        extracted_files_list = os.path.join(rpm_extract_dir, "filelist.txt")
+        cmd = "rpm2cpio %s | (cd %s ; cpio -idmv \"*/compatibility_matrix_*\" >> %s 2>&1)" %(rpm, rpm_extract_dir, extracted_files_list)
+        run_cmd(cmd)
+        with open(extracted_files_list, 'r') as fd:
+            matrix_files = fd.read().splitlines()
+        extracted = []
+        for f in matrix_files:
+            if f.endswith(".json"):
+                logger.debug("Extracted %s from the SMU %s" %(f, rpm))
+                extracted.append(os.path.join(rpm_extract_dir, f))
+        return extracted
+
     def do_compat_check(self, repo_path, input_rpms, iso_key, eRepo):
         rpm_file_list = ""
         all_rpms = []
@@ -2067,9 +2357,9 @@ class Iso(object):
         rpm_staging_dir = "%s/rpms/" % self.iso_extract_path
         os.mkdir(rpm_staging_dir)
         input_rpms_set = set(input_rpms)
-        iso_rpms_set = set(list(map(os.path.basename, self.iso_rpms)))
+        iso_rpms_set = set(map(os.path.basename, self.iso_rpms))
         logger.debug("ISO RPMS:")
-        list(map(logger.debug, iso_rpms_set))
+        _log_lines(logging.DEBUG, iso_rpms_set)
 
         dup_input_rpms_set = input_rpms_set & iso_rpms_set
         # TBD Detect dup input rpms based on provides info of base iso pkgs
@@ -2081,15 +2371,17 @@ class Iso(object):
                    all_rpms.append(rpm_path)
         all_rpms += self.iso_rpms
         all_rpms = list(set(all_rpms))
+        staged_rpms = []
+        matrix_rpms = []
         try:
             for rpm in all_rpms:
               # In 712 and some otehr release base rpm version part of smu is 
               # lower version than base rpm in initrd. Due to this GISO build compatibility 
               # check failed. So skipping base rpm from compatibility check
-              if global_platform_name not in rpm and not re.search('CSC[a-z][a-z]\d{5}', rpm):
+              if global_platform_name not in rpm and not _CSC_ID_RE.search(rpm):
                   continue
               if os.path.isfile(rpm):
-                shutil.copy(rpm, rpm_staging_dir)
+                staged_rpms.append(rpm)
                 rpm_file_list = "%s/rpms/%s  " % (rpm_file_list,
                                               os.path.basename(rpm))
 
@@ -2101,24 +2393,39 @@ class Iso(object):
                 else:
                    matrix_pkg = "-infra-"
                 if "CSC" in rpm and matrix_pkg in rpm:
-                   rpm_extract_dir = tempfile.mkdtemp(dir=pwd)
-                   extracted_files_list = os.path.join(rpm_extract_dir, "filelist.txt")
-                   cmd = "rpm2cpio %s | (cd %s ; cpio -idmv \"*/compatibility_matrix_*\" >> %s 2>&1)" %(rpm, rpm_extract_dir, extracted_files_list)
-                   run_cmd(cmd)
-                   with open(extracted_files_list, 'r') as fd:
-                      matrix_files = fd.read().splitlines()
-                   for f in matrix_files:
-                      if os.path.exists(self.matrix_extract_path) and f.endswith(".json"):
-                         logger.debug("Extracted %s from the SMU %s" %(f, rpm))               
-                         shutil.copy(os.path.join(rpm_extract_dir, f), self.matrix_extract_path)
-                   shutil.rmtree(rpm_extract_dir, ignore_errors=True)
-                   run_cmd("cd %s" % (pwd))
+                   matrix_rpms.append(rpm)
               else:
                 # if RPM doesn't exist look at eRepo
                 eRpm = rpm.split('/')[-1]
-                shutil.copy(eRepo+'/'+eRpm, rpm_staging_dir)
+                staged_rpms.append(eRepo+'/'+eRpm)
                 rpm_file_list = "%s/rpms/%s " % (rpm_file_list, eRpm)
-            run_cmd("chmod 644 %s/rpms/*.rpm"%(self.iso_extract_path))
+            # Copies and matrix extractions are independent per rpm and spend
+            # their time in the kernel or in child processes, so run them on
+            # a few threads. Modes are normalized by the chmod below.
+            # Each extraction uses its own temp dir, the copies into the
+            # shared matrix_extract_path are done serially after the join.
+            matrix_tmp_dir = tempfile.mkdtemp(dir=os.getcwd())
+            try:
+                with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+                    # Several repos may hold the same rpm name, keep the last
+                    # one so no two workers write the same staged file
+                    staged_by_name = dict((os.path.basename(src), src)
+                                          for src in staged_rpms)
+                    list(executor.map(
+                        lambda item: shutil.copyfile(
+                            item[1], os.path.join(rpm_staging_dir, item[0])),
+                        staged_by_name.items()))
+                    matrix_files = list(executor.map(
+                        functools.partial(self.extract_matrix_files,
+                                          extract_dir=matrix_tmp_dir),
+                        matrix_rpms))
+                if matrix_rpms and os.path.exists(self.matrix_extract_path):
+                    for extracted in matrix_files:
+                        for f in extracted:
+                            shutil.copy(f, self.matrix_extract_path)
+            finally:
+                shutil.rmtree(matrix_tmp_dir, ignore_errors=True)
+            run_cmd_silent("chmod 644 %s/rpms/*.rpm"%(self.iso_extract_path))
         except:
             logger.info("\n\t...Failed to copy files to staging directory")
 
@@ -2129,11 +2436,14 @@ class Iso(object):
         PkgSigCheckList = []
         logger.debug("The ISO key is %s"%(iso_key))
         try:
-            for pkg in input_rpms_unique:
-                if global_platform_name not in pkg and not re.search('CSC[a-z][a-z]\d{5}', pkg):
-                    continue
-                key: str = None
-                key_cmd: str = ("chroot %s rpm -qip rpms/%s"%(self.iso_extract_path, pkg))
+            sig_check_pkgs = [pkg for pkg in input_rpms_unique
+                              if global_platform_name in pkg or _CSC_ID_RE.search(pkg)]
+            sig_lines = []
+            if sig_check_pkgs:
+                # Query all packages with one rpm invocation, it prints one
+                # info block, and so one Signature line, per package in order
+                key_cmd: str = ("chroot %s rpm -qip %s"%(self.iso_extract_path,
+                    " ".join("rpms/%s" % pkg for pkg in sig_check_pkgs)))
                 key_cmd: str = modifyCubesCmd(key_cmd)
                 cp: subprocess.CompletedProcess = subprocess.run(key_cmd,
                             stderr=subprocess.PIPE, stdout=subprocess.PIPE,
@@ -2141,9 +2451,14 @@ class Iso(object):
                 logger.debug("\nCMD:%s\nSTDOUT:%s\nSTDERR:%s"%(
                     key_cmd, cp.stdout.decode(), cp.stderr.decode()
                 ))
-                ret: str = cp.stdout.decode()
+                sig_lines = _RPM_SIGNATURE_RE.findall(cp.stdout.decode())
+                if len(sig_lines) != len(sig_check_pkgs):
+                    raise RuntimeError("Expected %d Rpm Signatures, got %d"
+                                       % (len(sig_check_pkgs), len(sig_lines)))
+            for pkg, sig_line in zip(sig_check_pkgs, sig_lines):
+                key: str = None
                 # Signature   : RSA/8, Thu Jul 18 07:02:07 2024, Key ID 17f6e0b8e554753f
-                key_match: (re.Match[str] | None) = re.search(r"Signature\s*:.+Key ID\s+([0-9a-zA-Z]{16})", ret)
+                key_match: (re.Match[str] | None) = re.search(r"Key ID\s+([0-9a-zA-Z]{16})", sig_line)
                 if key_match:
                     key = key_match.groups()[0]
                     logger.debug("RPM: %s -> Key: %s"%(pkg, key))
@@ -2187,7 +2502,7 @@ class Iso(object):
             rpm_log_data = errstr.split("\n")
             err_log = []
             for line in rpm_log_data:
-                logger.debug('%s' % line)
+                logger.debug('%s', line)
                 if re.match('.*Failed dependencies.*', line):
                     continue
                 elif re.match('(\s*/)', line) or (not line):
@@ -2254,7 +2569,7 @@ class Iso(object):
 
 
 class Giso:
-    SUPPORTED_PLATFORMS = ["asr9k", "ncs1k", "ncs1001", "ncs5k", "ncs5500", "ncs6k", "ncs560","ncs540", 'iosxrwb', 'iosxrwbd', "ncs1004", "xrv9k"]
+    SUPPORTED_PLATFORMS = frozenset(["asr9k", "ncs1k", "ncs1001", "ncs5k", "ncs5500", "ncs6k", "ncs560","ncs540", 'iosxrwb', 'iosxrwbd', "ncs1004", "xrv9k"])
     SUPPORTED_BASE_ISO = ["mini", "minik9"]
     SMU_CONFIG_SUMMARY_FILE = "giso_summary.txt"
     ISO_INFO_FILE = "iso_info.txt"
@@ -2264,15 +2579,16 @@ class Giso:
     GOLDEN_STRING = "golden"
     GOLDEN_K9_STRING = "goldenk9"
     GISO_INFO_TXT = "giso_info.txt"
-    NESTED_ISO_PLATFORMS = ["ncs5500", "ncs560", "ncs540", "iosxrwbd"]
+    NESTED_ISO_PLATFORMS = frozenset(["ncs5500", "ncs560", "ncs540", "iosxrwbd"])
     GISO_SCRIPT = "autorun"
     ISO_RPM_KEY ="(none)"
     def __init__(self):
         self.repo_path = None
         self.bundle_iso = None
-        self.vm_iso = {"XR": None, "CALVADOS": None, "HOST": None}
+        # Keyed in Giso.VM_TYPE order, which the loops over items() rely on
+        self.vm_iso = dict.fromkeys(Giso.VM_TYPE)
         self.giso_dir = None
-        self.vm_rpm_file_paths = {"XR": None, "CALVADOS": None, "HOST": None}
+        self.vm_rpm_file_paths = dict.fromkeys(Giso.VM_TYPE)
         self.xrconfig = None
         self.ztp_ini = None
         self.system_image = None
@@ -2303,6 +2619,8 @@ class Giso:
         self.script_md5sum = None
 
         self.matrix_extract_path = None
+        self.iso_dir_files = None
+        self.initrd_cache = {}
         
     #
     # Giso object Setter Api's
@@ -2359,8 +2677,13 @@ class Giso:
            #print("ISO MOUNTED AT  %s"%(IsoMountPath))
            os.chdir(optimised_rpm_path)
            run_cmd("zcat -f  %s | cpio -idu"%(repo+"/boot/initrd.img"))
-           run_cmd("isoinfo -R -i iso/system_image.iso -x /boot/initrd.img >initrd2.img")
-           run_cmd("zcat -f initrd2.img | cpio -idu")
+           # Stream the inner initrd straight into cpio rather than staging
+           # a copy of it on disk. isoinfo and cpio failures are fatal, zcat
+           # may exit 2 on a trailing padding warning so it is not checked.
+           run_cmd("isoinfo -R -i iso/system_image.iso "
+                   "-x /boot/initrd.img | zcat -f | cpio -idu; "
+                   "rc=(\"${PIPESTATUS[@]}\"); "
+                   "[ ${rc[0]} -eq 0 ] && [ ${rc[2]} -eq 0 ]")
            os.chdir(pwd)
            return optimised_rpm_path
         else:
@@ -2382,11 +2705,12 @@ class Giso:
         # Find RPM path in the Giso
         RpmPathInGiso = ""
         with open(GisoMountDir+"/giso_info.txt", 'r') as fd:
-             GisoInfo = fd.read()
-        for line in GisoInfo.split('\n'):
-            if line.split(' ')[0] == 'RPM_PATH:':
-               RpmPathInGiso = line.split(' ')[-1]
-               break
+            for line in fd:
+                if line.startswith('RPM_PATH:'):
+                    line = line.rstrip('\n')
+                    if line.split(' ', 1)[0] == 'RPM_PATH:':
+                        RpmPathInGiso = line.rsplit(' ', 1)[-1]
+                        break
         logger.debug("RPM location in the given gISO %s"%(RpmPathInGiso))
 
         if DEFAULT_RPM_PATH == RpmPathInGiso:
@@ -2406,30 +2730,27 @@ class Giso:
            return False
 
         logger.info("Following RPMS found in the input gISO")
-        if os.path.exists(iso_rpm_path+"/xr_rpms"): 
-           xr_extgiso_rpms = glob.glob(iso_rpm_path+"/xr_rpms/*")
-           for rpm in xr_extgiso_rpms:
-               self.xr_extgiso_rpms.append(os.path.basename(rpm))
-               logger.info("\t%s"%(os.path.basename(rpm)))
-           ret=run_cmd("cp %s/xr_rpms/* %s/"%(iso_rpm_path, extended_rpm_dir))
-           self.gisoExtendRpms += len(self.xr_extgiso_rpms)
-
-
-        if os.path.exists(iso_rpm_path+"/calvados_rpms"):
-           cal_extgiso_rpms = glob.glob(iso_rpm_path+"/calvados_rpms/*")
-           for rpm in cal_extgiso_rpms:
-               self.cal_extgiso_rpms.append(os.path.basename(rpm))
-               logger.info("\t%s"%(os.path.basename(rpm)))
-           ret=run_cmd("cp %s/calvados_rpms/* %s/"%(iso_rpm_path, extended_rpm_dir))
-           self.gisoExtendRpms += len(self.cal_extgiso_rpms)
-
-        if os.path.exists(iso_rpm_path+"/host_rpms"):
-           host_extgiso_rpms = glob.glob(iso_rpm_path+"/host_rpms/*")
-           for rpm in host_extgiso_rpms:
-               self.host_extgiso_rpms.append(os.path.basename(rpm))
-               logger.info("\t%s"%(os.path.basename(rpm)))
-           ret=run_cmd("cp %s/host_rpms/* %s/"%(iso_rpm_path, extended_rpm_dir))
-           self.gisoExtendRpms += len(self.host_extgiso_rpms)
+        rpm_dirs = (("xr_rpms", self.xr_extgiso_rpms),
+                    ("calvados_rpms", self.cal_extgiso_rpms),
+                    ("host_rpms", self.host_extgiso_rpms))
+        # The per vm copies are disk bound and independent, so overlap them.
+        # Results are collected after the join to keep the listing in order.
+        # A vm directory missing from the gISO comes back as None.
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=len(rpm_dirs)) as executor:
+            copies = [(extgiso_rpms,
+                       executor.submit(_copy_dir_files,
+                                       iso_rpm_path+"/"+rpm_dir,
+                                       extended_rpm_dir))
+                      for rpm_dir, extgiso_rpms in rpm_dirs]
+        for extgiso_rpms, copy in copies:
+            copied_rpms = copy.result()
+            if copied_rpms is None:
+                continue
+            for rpm in copied_rpms:
+                extgiso_rpms.append(rpm)
+                logger.info("\t%s"%(rpm))
+            self.gisoExtendRpms += len(extgiso_rpms)
         self.ExtendRpmRepository = extended_rpm_dir
 
         # if input is optimised gISO then we have to extract rpms from
@@ -2455,10 +2776,10 @@ class Giso:
             gen_cmd = "chroot %s rpm --import %s"%(fs_root, "boot/certs/public-key.gpg")
             gen_cmd = modifyCubesCmd(gen_cmd)
             ret = run_cmd(gen_cmd)
-            gen_cmd = "chroot %s rpm -qa | grep %s"%(fs_root, "gpg-pubkey")
+            gen_cmd = "chroot %s rpm -q gpg-pubkey --qf '%%{VERSION}\\n'"%(fs_root)
             gen_cmd = modifyCubesCmd(gen_cmd)
             ret = run_cmd(gen_cmd)
-            key = ret["output"].split("-")[-2]
+            key = ret["output"].split()[-1]
             self.ISO_RPM_KEY = key
             logger.debug("The ISO Key is %s\n"%(key))
         else:
@@ -2487,11 +2808,7 @@ class Giso:
 
     @staticmethod
     def is_platform_supported(platform):
-        try:
-            Giso.SUPPORTED_PLATFORMS.index(platform)
-            return True
-        except:
-            return False
+        return platform in Giso.SUPPORTED_PLATFORMS
 
     def is_bundle_image_type_supported(self):
         for sup_iso_type in Giso.SUPPORTED_BASE_ISO:
@@ -2552,18 +2869,18 @@ class Giso:
                         result = run_cmd("grep %s %s" % (search_str, 
                                                          bootstrap_file))
                         self.supp_archs[x] = \
-                            list(map(lambda y: y.replace('\n', ''),
-                                result['output'].split('=')[1].split(',')))
-                        logger.debug('vm_type %s Supp Archs: ' % x)
-                        list(map(lambda y: logger.debug("%s" % y), self.supp_archs[x]))
+                            [y.replace('\n', '') for y in
+                             result['output'].split('=')[1].split(',')]
+                        logger.debug('vm_type %s Supp Archs: ', x)
+                        _log_lines(logging.DEBUG, self.supp_archs[x])
                     except Exception as e:
                         logger.debug(str(e))
             else:
                 logger.debug("Failed to find %s file. Using Defaults archs" % 
                              bootstrap_file)
                 
-        logger.debug("Supp arch query for vm_type %s" % vm_type)
-        list(map(lambda y: logger.debug("%s" % y), self.supp_archs[vm_type]))
+        logger.debug("Supp arch query for vm_type %s", vm_type)
+        _log_lines(logging.DEBUG, self.supp_archs[vm_type])
         return self.supp_archs[vm_type]
 
     @staticmethod
@@ -2576,7 +2893,8 @@ class Giso:
     #
 
     def do_compat_check(self, input_rpms, vm_type):
-        if self.vm_iso[vm_type] is None:
+        iso = self.vm_iso[vm_type]
+        if iso is None:
             iso = Iso()
             vm_type_iso_file = self.get_vm_type_iso_file(vm_type)
             iso.set_iso_info(vm_type_iso_file)
@@ -2584,50 +2902,48 @@ class Giso:
             if mpath:
                self.matrix_extract_path = mpath
             self.vm_iso[vm_type] = iso
-        else:
-            iso = self.vm_iso[vm_type]
         return iso.do_compat_check(self.repo_path, input_rpms,
                                    self.ISO_RPM_KEY, self.ExtendRpmRepository)
     def get_vm_type_iso_file(self, vm_type):
-        iso_file_names = glob.glob('%s/iso/*' % 
-                                   (self.get_bundle_iso_extract_path()))
-        vm_type_iso_file = ''
+        # The iso directory of the bundle does not change, list it once
+        # for all vm types
+        if self.iso_dir_files is None:
+            iso_dir = '%s/iso' % (self.get_bundle_iso_extract_path())
+            self.iso_dir_files = []
+            if os.path.isdir(iso_dir):
+                self.iso_dir_files = [(os.path.basename(iso_file).upper(), iso_file)
+                                      for iso_file in _scandir_paths(iso_dir)]
         # Name of the ISO doesnt match calvados vm_type
         # Hence search SYSADMIN ISO name for calvados vm_type.
         iso_name = "SYSADMIN.ISO" if vm_type == "CALVADOS" \
                    else vm_type + '.ISO'
-        for iso_file in iso_file_names:
-            vm_type_iso_file = \
-                iso_file if iso_name in os.path.basename(iso_file).upper() \
-                else None            
-            if vm_type_iso_file is not None:
-                break
-        logger.debug("ISO  %s vm_type %s searchkey %s"
-                     % (vm_type_iso_file, vm_type, iso_name))
-        if vm_type_iso_file is None:
-            return -1  # raise
-        else:
-            return vm_type_iso_file
+        for upper_name, iso_file in self.iso_dir_files:
+            if iso_name in upper_name:
+                logger.debug("ISO  %s vm_type %s searchkey %s",
+                             iso_file, vm_type, iso_name)
+                return iso_file
+        logger.debug("ISO  None vm_type %s searchkey %s", vm_type, iso_name)
+        return -1  # raise
 
     def is_new_format_giso_name_supported(self, version):
 
-        retval = False 
         version_tupple = version.split('.')
+        major = int(version_tupple[0])
+        if major != 6:
+            return major > 6
 
-        if int(version_tupple[0]) > 6:
-            retval = True
-        elif int(version_tupple[0]) == 6 and int(version_tupple[1]) > 5 :
-            retval = True
-        elif len(version_tupple) == 3 and int(version_tupple[0]) == 6 and \
-             int(version_tupple[1]) == 5 and int(version_tupple[2]) == 2:
-            retval = True
-        elif len(version_tupple) >= 3 and int(version_tupple[0]) == 6 and \
-             int(version_tupple[1]) == 5 and int(version_tupple[2]) > 2:
-            retval = True
-        elif len(version_tupple) == 3 and int(version_tupple[0]) == 6 and \
-             int(version_tupple[1]) == 3 and int(version_tupple[2]) == 3:
-            retval = True
-        return retval
+        minor = int(version_tupple[1])
+        if minor > 5:
+            return True
+        if minor not in (3, 5) or len(version_tupple) < 3:
+            return False
+
+        patch = int(version_tupple[2])
+        if minor == 5:
+            # 6.5.2 only as a three field version, anything after it always
+            return patch > 2 or (patch == 2 and len(version_tupple) == 3)
+        # 6.3.3 is the only 6.3 release with the new name format
+        return patch == 3 and len(version_tupple) == 3
 
     def giso_optional_label_supported(self):
         version = self.get_bundle_iso_version()
@@ -2672,60 +2988,55 @@ class Giso:
         with open("%s/%s" % (self.giso_dir, iso.ISO_INFO_FILE), 'w') as f:
             f.write(iso_info_raw)
 
-        giso_pkg_fmt_ver = GISO_PKG_FMT_VER
-        name = giso_name_string
         version = '%s-%s' % (iso.get_iso_version(), self.giso_ver_label)
-        built_by = getpass.getuser()
-        built_on = datetime.now().strftime("%a %b %d %H:%M:%S")
-        built_host = socket.gethostname()
-        workspace = os.getcwd()
-        giso_info = '%s: %s\n%s: %s\n%s: %s\n%s: %s\n%s: %s\n%s: %s\n%s: %s\n'\
-                    % ("GISO_PKG_FMT_VER", giso_pkg_fmt_ver, "Name", name,
-                       "Version", version, "Built By", built_by,
-                       "Built On", built_on, "Build Host", built_host,
-                       "Workspace", workspace)
+        giso_info = ''.join('%s: %s\n' % field for field in (
+            ("GISO_PKG_FMT_VER", GISO_PKG_FMT_VER),
+            ("Name", giso_name_string),
+            ("Version", version),
+            ("Built By", getpass.getuser()),
+            ("Built On", datetime.now().strftime("%a %b %d %H:%M:%S")),
+            ("Build Host", socket.gethostname()),
+            ("Workspace", os.getcwd())))
 
         file_yaml = "%s/%s"%(self.giso_dir, "iosxr_image_mdata.yml")        
-        fd = open(file_yaml, 'r')
-        mdata = {}
-        mdata = yaml.safe_load(fd)
-        fd.close()
+        with open(file_yaml, 'r') as fd:
+            mdata = yaml.load(fd, Loader=_YAML_LOADER)
+
+        giso_info_parts = [giso_info, "RPM_PATH:  %s"%(self.giso_rpm_path)]
+        rpms_list = []
+        for vm_type, rpm_files in self.vm_rpm_file_paths.items():
+            vm_type_meta = vm_type.lower()
+            if rpm_files is not None:
+                giso_info_parts.append("\n\n%s rpms:\n" % vm_type)
+                giso_info_parts.append('\n'.join(rpm_files))
+                tmp_dict = {}
+                if vm_type_meta.upper() == CALVADOS_SUBSTRING:
+                    vm_type_meta = SYSADMIN_SUBSTRING.lower()
+                tmp_dict['%s rpms in golden ISO'%(vm_type_meta)] = ' '.join(rpm_files)
+                rpms_list.append(tmp_dict)
+        # if sp is present its added to yaml file to be displayed as part of
+        # show install package <giso>
+        if sp_name is not None:
+            tmp_dict = {}
+            tmp_dict['sp in golden ISO'] = os.path.basename(sp_name)
+            rpms_list.append(tmp_dict) 
+        # if XR Config file present then add the name
+        if self.xrconfig is not None:
+            giso_info_parts.append("\n\nXR-Config file:\n")
+            giso_info_parts.append("%s %s" % (self.xrconfig_md5sum, Giso.XR_CONFIG_FILE_NAME))
+
+        # if ztp ini file present then add the name
+        if self.ztp_ini is not None:
+            giso_info_parts.append("\n\nZTP INI file:\n")
+            giso_info_parts.append("%s %s" % (self.ztp_ini_md5sum, Giso.ZTP_INI_FILE_NAME))
+         
+        # if autorun script present then add the name
+        if self.script is not None:
+            giso_info_parts.append("\n\nUser script:\n")
+            giso_info_parts.append("%s %s" % (self.script_md5sum, Giso.GISO_SCRIPT))
 
         with open("%s/%s" % (self.giso_dir, Giso.GISO_INFO_TXT), 'w') as f:
-            f.write(giso_info)
-            f.write("RPM_PATH:  %s"%(self.giso_rpm_path))
-            rpms_list = []
-            for vm_type in Giso.VM_TYPE:
-                vm_type_meta = vm_type.lower()
-                rpm_files = self.vm_rpm_file_paths[vm_type]
-                if rpm_files is not None:
-                    f.write("\n\n%s rpms:\n" % vm_type)
-                    f.write('\n'.join(rpm_files))
-                    tmp_dict = {}
-                    if vm_type_meta.upper() == CALVADOS_SUBSTRING:
-                        vm_type_meta = SYSADMIN_SUBSTRING.lower()
-                    tmp_dict['%s rpms in golden ISO'%(vm_type_meta)] = ' '.join(rpm_files)
-                    rpms_list.append(tmp_dict)
-            # if sp is present its added to yaml file to be displayed as part of
-            # show install package <giso>
-            if sp_name is not None:
-                tmp_dict = {}
-                tmp_dict['sp in golden ISO'] = os.path.basename(sp_name)
-                rpms_list.append(tmp_dict) 
-            # if XR Config file present then add the name
-            if self.xrconfig is not None:
-                f.write("\n\nXR-Config file:\n")
-                f.write("%s %s" % (self.xrconfig_md5sum, Giso.XR_CONFIG_FILE_NAME))
-
-            # if ztp ini file present then add the name
-            if self.ztp_ini is not None:
-                f.write("\n\nZTP INI file:\n")
-                f.write("%s %s" % (self.ztp_ini_md5sum, Giso.ZTP_INI_FILE_NAME))
-             
-            # if autorun script present then add the name
-            if self.script is not None:
-                f.write("\n\nUser script:\n")
-                f.write("%s %s" % (self.script_md5sum, Giso.GISO_SCRIPT))
+            f.write(''.join(giso_info_parts))
 
         iso_mdata = mdata['iso_mdata']
         iso_mdata['name'] = "%s-%s"%(giso_name_string, iso.get_iso_version())
@@ -2736,9 +3047,8 @@ class Giso:
             iso_mdata['label'] = self.giso_ver_label
         mdata['iso_mdata'] = iso_mdata
         mdata['golden ISO rpms'] = rpms_list
-        fd = open(file_yaml, 'w')
-        fd.write(yaml.dump(mdata, default_flow_style=False))
-        fd.close()
+        with open(file_yaml, 'w') as fd:
+            yaml.dump(mdata, fd, Dumper=_YAML_DUMPER, default_flow_style=False)
 
  
         #New format GISO Name:(<platform>-<golden(k9)>-x-<version>-<label>.iso)
@@ -2771,8 +3081,8 @@ class Giso:
 
     def update_grub_cfg(self, iso):
         # update grub.cfg file with giso_boot parameter 
-        lines = []
         for grub_file in iso.GRUB_FILES:
+            lines = []
             with open("%s/%s" % (self.giso_dir, grub_file), 'r') as fd:
                 for line in fd:
                     if "root=" in line and "noissu" in line:
@@ -2781,36 +3091,29 @@ class Giso:
 
             # write updated grub.cfg
             with open("%s/%s" % (self.giso_dir, grub_file), 'w') as fd:
-                for line in lines:
-                    fd.write(line)
+                fd.writelines(lines)
 
     def get_inner_initrd(self, giso_dir):
-        pwd = cwd
-        initrd_extract_path = tempfile.mkdtemp(dir=pwd)
-        if initrd_extract_path is not None:
-            os.chdir(initrd_extract_path)
-            run_cmd("zcat -f %s%s | cpio -id" % (giso_dir, Iso.ISO_INITRD_RPATH))
-            os.chdir(pwd)
-        
-        system_image_iso_path = "%s/%s" % (initrd_extract_path, "iso/system_image.iso")
-        if os.path.exists(system_image_iso_path):
-            pwd = cwd
-            system_image_iso_extract_path = tempfile.mkdtemp(dir=pwd)
-            if system_image_iso_extract_path is not None:
-                readiso(system_image_iso_path, system_image_iso_extract_path)
-        
-        pwd = cwd
-        inner_initrd_extract_path = tempfile.mkdtemp(dir=pwd)
-        if inner_initrd_extract_path is not None:
-            os.chdir(inner_initrd_extract_path)
-            run_cmd("zcat -f %s%s | cpio -id" % (system_image_iso_extract_path, Iso.ISO_INITRD_RPATH))
-            os.chdir(pwd)
-
-        if initrd_extract_path is not None:
-            run_cmd("rm -rf " + initrd_extract_path)
-
-        if system_image_iso_extract_path is not None:
-            run_cmd("rm -rf " +  system_image_iso_extract_path)
+        # Only the inner initrd outlives this call; the outer initrd extract
+        # is dropped on the way out, even on error
+        inner_initrd_extract_path = tempfile.mkdtemp(dir=cwd)
+        try:
+            with tempfile.TemporaryDirectory(dir=cwd) as initrd_extract_path:
+                _extract_initrd(giso_dir + Iso.ISO_INITRD_RPATH, initrd_extract_path)
+
+                # Only the initrd of system_image.iso is needed, so stream it
+                # out of the iso instead of extracting the whole iso to disk.
+                # zcat may exit 2 on trailing padding, only isoinfo and cpio
+                # failures are fatal.
+                system_image_iso_path = "%s/%s" % (initrd_extract_path, "iso/system_image.iso")
+                run_cmd("isoinfo -R -i %s -x %s | zcat -f | "
+                        "(cd %s && cpio -id); rc=(\"${PIPESTATUS[@]}\"); "
+                        "[ ${rc[0]} -eq 0 ] && [ ${rc[2]} -eq 0 ]"
+                        % (system_image_iso_path, Iso.ISO_INITRD_RPATH,
+                           inner_initrd_extract_path))
+        except Exception:
+            shutil.rmtree(inner_initrd_extract_path, ignore_errors=True)
+            raise
 
         return inner_initrd_extract_path
 
@@ -2818,28 +3121,40 @@ class Giso:
         pwd = cwd
         initrd_extract_path = tempfile.mkdtemp(dir=pwd)
         if initrd_extract_path is not None:
-            os.chdir(initrd_extract_path)
-            run_cmd("zcat -f %s%s | cpio -id" % (giso_dir, Iso.ISO_INITRD_RPATH))
-            os.chdir(pwd)
+            _extract_initrd(giso_dir + Iso.ISO_INITRD_RPATH, initrd_extract_path)
 
         return initrd_extract_path
         
+    #
+    # Base rpms of all hostos rpms come out of the same initrd, so extract
+    # it once per giso_dir and reuse it until cleanup_initrd_cache().
+    #
+    def get_cached_initrd(self, plat, giso_dir):
+        nested = plat in Giso.NESTED_ISO_PLATFORMS
+        key = (giso_dir, nested)
+        if key not in self.initrd_cache:
+            if nested:
+                self.initrd_cache[key] = self.get_inner_initrd(giso_dir)
+            else:
+                self.initrd_cache[key] = self.get_initrd(giso_dir)
+        return self.initrd_cache[key]
+
+    def cleanup_initrd_cache(self):
+        for initrd_path in self.initrd_cache.values():
+            if initrd_path is not None:
+                shutil.rmtree(initrd_path, ignore_errors=True)
+        self.initrd_cache.clear()
+
     # get base rpm of the spiritboot or hostos
     def get_base_rpm(self, plat, vm_type, rpm_file, giso_dir, giso_repo_path):
 
         base_rpm_path = None
-        if plat in Giso.NESTED_ISO_PLATFORMS:
-            initrd_path = self.get_inner_initrd(giso_dir)
-        else:
-            initrd_path = self.get_initrd(giso_dir)
+        initrd_path = self.get_cached_initrd(plat, giso_dir)
 
         if rpm_file.endswith('.rpm'):
-            mre = re.search(r'(.*)-(.*)-(.*)\.(.*)(\.rpm)', rpm_file)
-            if mre:
-                s_rpm_name = mre.groups()[0]
-                s_rpm_ver = mre.groups()[1]
-                s_rpm_rel = mre.groups()[2]
-                s_rpm_arch = mre.groups()[3]
+            nvra = _split_rpm_file_name(rpm_file)
+            if nvra:
+                s_rpm_name, s_rpm_ver, s_rpm_rel, s_rpm_arch = nvra
 
         if vm_type == HOST_SUBSTRING:
             '''
@@ -2856,7 +3171,7 @@ class Giso:
                                 shutil.copy(rpm_path, giso_repo_path)
                                 base_rpm_path = rpm_path
                                 break
-                        run_cmd("rm -rf " + host_iso_extract_path)
+                        run_cmd_silent("rm -rf " + host_iso_extract_path)
             '''
 
             if s_rpm_arch == "arm":
@@ -2874,7 +3189,7 @@ class Giso:
                             shutil.copy(rpm_path, giso_repo_path)
                             base_rpm_path = rpm_path
                             break
-                    run_cmd("rm -rf " + nbi_initrd_extract_path)
+                    run_cmd_silent("rm -rf " + nbi_initrd_extract_path)
 
 
         elif vm_type == SYSADMIN_SUBSTRING:
@@ -2892,7 +3207,7 @@ class Giso:
                                 shutil.copy(rpm_path, giso_repo_path)
                                 base_rpm_path = rpm_path
                                 break
-                        run_cmd("rm -rf " + sysadmin_iso_extract_path)
+                        run_cmd_silent("rm -rf " + sysadmin_iso_extract_path)
             '''
             if s_rpm_arch == "arm":
                 nbi_initrd_img_name = "%s-sysadmin-nbi-initrd.img" % (plat)
@@ -2909,7 +3224,7 @@ class Giso:
                             shutil.copy(rpm_path, giso_repo_path)
                             base_rpm_path = rpm_path
                             break
-                    run_cmd("rm -rf " + nbi_initrd_extract_path)
+                    run_cmd_silent("rm -rf " + nbi_initrd_extract_path)
         elif vm_type == XR_SUBSTRING:
             xr_iso_path = "%s/%s/%s%s" % (initrd_path, "iso", plat, "-xr.iso")
             if os.path.exists(xr_iso_path):
@@ -2923,20 +3238,22 @@ class Giso:
                             shutil.copy(rpm_path, giso_repo_path)
                             base_rpm_path = rpm_path
                             break
-                    run_cmd("rm -rf " + xr_iso_extract_path)
-        
-        if initrd_path is not None:
-            run_cmd("rm -rf " + initrd_path)
-            
+                    run_cmd_silent("rm -rf " + xr_iso_extract_path)
+
         return base_rpm_path
 
+    # True when the bzImage of the bundle must be replaced by update_bzimage()
+    def needs_bzimage_update(self, plat):
+        return plat == "ncs5500" and \
+               self.get_bundle_iso_version() in BZIMAGE_712_RELEASES
+
     def update_bzimage(self, giso_dir):
         script_dir = os.path.abspath( os.path.dirname( __file__ ))
         bzImage_712_path = script_dir + "/" + BZIMAGE_712
         if os.path.exists(bzImage_712_path):
             logger.debug("Replacing top level bzImage in GISO with %s to support PXE boot of >2GB ISO" %(bzImage_712_path))
-            cmd="cp %s %s/%s" %(bzImage_712_path, giso_dir, "boot/bzImage")
-            run_cmd(cmd)
+            shutil.copyfile(bzImage_712_path,
+                            os.path.join(giso_dir, "boot/bzImage"))
 
     #
     # Build Golden ISO.
@@ -2953,8 +3270,10 @@ class Giso:
         repo = ""
         self.giso_dir = "%s/giso_files_dir" % pwd
         self.rpmdb_version = rpm_db.rpmdb_version
+        # A leftover giso directory of an earlier run can hold thousands of
+        # rpms; delete it alongside the build instead of ahead of it
         if os.path.exists(self.giso_dir):
-            shutil.rmtree(self.giso_dir)
+            _rmtree_in_background(self.giso_dir)
         os.chdir(pwd)
 
         # ncs5500 iso structure is slightly different than other exr platform 
@@ -2971,106 +3290,96 @@ class Giso:
             self.bundle_iso = Iso() 
             self.bundle_iso.set_iso_info(iso_path)
 
-        shutil.copytree(self.bundle_iso.get_iso_mount_path(), self.giso_dir)
+        _clone_tree(self.bundle_iso.get_iso_mount_path(), self.giso_dir)
 
         logger.info("Summary .....")
         duplicate_xr_rpms = []
         duplicate_calv_rpms = []
         duplicate_host_rpms = []
+        # (source, destination dir) of the rpms staged into the giso,
+        # copied together once all of them are known
+        rpm_copies = []
+        if self.ExtendRpmRepository and os.path.isdir(self.ExtendRpmRepository) \
+                and self.ExtendRpmRepository not in self.repo_path:
+            self.repo_path.append(self.ExtendRpmRepository)
+        # Repository of each rpm file name, from one listing per repository.
+        # Later repositories win, as when every repository was probed per rpm.
+        repo_of_rpm = {}
+        for rpath in self.repo_path:
+            if os.path.isdir(rpath):
+                for file_path in _scandir_paths(rpath):
+                    repo_of_rpm[os.path.basename(file_path)] = rpath
         signing_env = pathlib.Path(self.giso_dir).parents[1] / ".signing_env"
         #logger.info("build_giso:Signing ENV: ", signing_env)
         if signing_env.exists():
             f_giso_rpms =  (signing_env / 'rpms_packaged_in_giso.txt').__str__()
         else:
             f_giso_rpms =  'rpms_packaged_in_giso.txt'
-        with open(f_giso_rpms,"w") as fdr:
-            for vm_type in Giso.VM_TYPE:
-                rpm_files = self.vm_rpm_file_paths[vm_type]
-                if rpm_files is not None:
-                    giso_repo_path = "%s/%s_rpms" % (self.giso_dir, 
-                                                     str(vm_type).lower())
-                    try:
-                        os.mkdir(giso_repo_path)
-                    except:
-                        if self.is_extend_giso: 
-                           logger.debug("Info: extending, giso directory exist") 
-                        else:
-                           raise
-                    if vm_type == CALVADOS_SUBSTRING:
-                        vm_type = SYSADMIN_SUBSTRING
-                    logger.info("\n%s rpms:" % vm_type)
-
-                    for rpm_file in rpm_files:
-                        rpm_file_basename = os.path.basename(rpm_file)
-                        if vm_type == HOST_SUBSTRING: 
-                            if (plat in rpm_file_basename) and (HOSTOS_SUBSTRING in rpm_file_basename): 
-                                host_base_rpm = self.get_base_rpm(plat, vm_type, rpm_file_basename, self.giso_dir, giso_repo_path)
-                                logger.debug("\nbase rpm of %s: %s" % (rpm_file, host_base_rpm))
-
-                            duplicate_present = False
-                            if rpm_db.vm_sp_rpm_file_paths[HOST_SUBSTRING] is not None:
-                                for sp_rpm_file in rpm_db.vm_sp_rpm_file_paths[HOST_SUBSTRING]:
-                                    if rpm_file in sp_rpm_file:
-                                        duplicate_host_rpms.append(rpm_file)
-                                        duplicate_present = True
-                                        break
-                                if duplicate_present:
-                                    continue
-
-                        if vm_type == SYSADMIN_SUBSTRING: 
-                            if (plat in rpm_file_basename) and (HOSTOS_SUBSTRING in rpm_file_basename): 
-                                sysadmin_base_rpm = self.get_base_rpm(plat, vm_type, rpm_file_basename, self.giso_dir, giso_repo_path)
-                                logger.debug("\nbase rpm of %s: %s" % (rpm_file, sysadmin_base_rpm))
-
-                            duplicate_present = False
-                            if rpm_db.vm_sp_rpm_file_paths[CALVADOS_SUBSTRING] is not None:
-                                for sp_rpm_file in rpm_db.vm_sp_rpm_file_paths[CALVADOS_SUBSTRING]:
-                                    if rpm_file in sp_rpm_file:
-                                        duplicate_calv_rpms.append(rpm_file)
-                                        duplicate_present = True
-                                        break
-                                if duplicate_present:
-                                    continue
-
-                        if vm_type == XR_SUBSTRING: 
-                            '''
-                            if (plat in rpm_file_basename) and (SPIRIT_BOOT_SUBSTRING in rpm_file_basename): 
-                                xr_base_rpm = self.get_base_rpm(plat, vm_type, rpm_file_basename, self.giso_dir, giso_repo_path)
-                                logger.debug("\nbase rpm of %s: %s" % (rpm_file, xr_base_rpm))
-                            '''
-
-                            duplicate_present = False
-                            if rpm_db.vm_sp_rpm_file_paths[XR_SUBSTRING] is not None:
-                                for sp_rpm_file in rpm_db.vm_sp_rpm_file_paths[XR_SUBSTRING]:
-                                    if rpm_file in sp_rpm_file:
-                                        duplicate_xr_rpms.append(rpm_file)
-                                        duplicate_present = True
-                                        break
-                                if duplicate_present:
-                                    continue
-                        rpm_count += 1
-                        if self.ExtendRpmRepository and os.path.isdir(self.ExtendRpmRepository):
-                           self.repo_path.append(self.ExtendRpmRepository)
-                        for rpath in self.repo_path:
-                            if os.path.isfile(rpath+'/'+rpm_file):
-                               repo=rpath 
-                        shutil.copy('%s/%s' % (repo, rpm_file),
-                                    giso_repo_path)
-                        logger.info('\t%s' % (os.path.basename(rpm_file)))
-                        fdr.write("%s\n"%os.path.basename(rpm_file))
-                        rpms = True
-                        if "-k9sec-" in rpm_file:
-                            self.k9sec_present = True
-                # TODO: Print duplicate
-                if vm_type == HOST_SUBSTRING and duplicate_host_rpms:
-                    logger.debug("\nSkipped following duplicate host rpms from repo\n")
-                    list(map(lambda file_name: logger.debug("\t(-) %s" % file_name), duplicate_host_rpms))
-                if vm_type == SYSADMIN_SUBSTRING and duplicate_calv_rpms:
-                    logger.debug("\nSkipped following duplicate calvados rpm from repo\n")
-                    list(map(lambda file_name: logger.debug("\t(-) %s" % file_name), duplicate_calv_rpms))
-                if vm_type == XR_SUBSTRING and duplicate_xr_rpms:
-                    logger.debug("\nSkipped following duplicate xr rpm from repo\n")
-                    list(map(lambda file_name: logger.debug("\t(-) %s" % file_name), duplicate_xr_rpms))
+        # Names of the service pack rpms per vm, which take precedence over
+        # the same rpm from the repository
+        sp_rpm_names = {vm: {os.path.basename(sp_rpm_file) for sp_rpm_file
+                             in (rpm_db.vm_sp_rpm_file_paths[vm] or ())}
+                        for vm in (HOST_SUBSTRING, CALVADOS_SUBSTRING,
+                                   XR_SUBSTRING)}
+        # Per vm the service pack rpm names, and the repository rpms skipped
+        # as duplicates of them
+        duplicates_by_vm = {
+            HOST_SUBSTRING: (sp_rpm_names[HOST_SUBSTRING], duplicate_host_rpms),
+            SYSADMIN_SUBSTRING: (sp_rpm_names[CALVADOS_SUBSTRING],
+                                 duplicate_calv_rpms),
+            XR_SUBSTRING: (sp_rpm_names[XR_SUBSTRING], duplicate_xr_rpms)}
+        giso_rpm_names = []
+        for vm_type, rpm_files in self.vm_rpm_file_paths.items():
+            if rpm_files is not None:
+                giso_repo_path = "%s/%s_rpms" % (self.giso_dir, 
+                                                 str(vm_type).lower())
+                try:
+                    os.mkdir(giso_repo_path)
+                except:
+                    if self.is_extend_giso: 
+                       logger.debug("Info: extending, giso directory exist") 
+                    else:
+                       raise
+                if vm_type == CALVADOS_SUBSTRING:
+                    vm_type = SYSADMIN_SUBSTRING
+                logger.info("\n%s rpms:" % vm_type)
+
+                sp_names, duplicate_rpms = duplicates_by_vm[vm_type]
+                for rpm_file in rpm_files:
+                    rpm_file_basename = os.path.basename(rpm_file)
+                    # hostos rpms of host and sysadmin need their base rpm
+                    if vm_type != XR_SUBSTRING and \
+                            (plat in rpm_file_basename) and (HOSTOS_SUBSTRING in rpm_file_basename):
+                        base_rpm = self.get_base_rpm(plat, vm_type, rpm_file_basename, self.giso_dir, giso_repo_path)
+                        logger.debug("\nbase rpm of %s: %s" % (rpm_file, base_rpm))
+
+                    if rpm_file_basename in sp_names:
+                        duplicate_rpms.append(rpm_file)
+                        continue
+                    rpm_count += 1
+                    repo = repo_of_rpm.get(rpm_file, repo)
+                    rpm_copies.append(('%s/%s' % (repo, rpm_file),
+                                       giso_repo_path))
+                    logger.info('\t%s' % (os.path.basename(rpm_file)))
+                    giso_rpm_names.append(os.path.basename(rpm_file))
+                    rpms = True
+                    if "-k9sec-" in rpm_file:
+                        self.k9sec_present = True
+            # TODO: Print duplicate
+            if vm_type == HOST_SUBSTRING and duplicate_host_rpms:
+                logger.debug("\nSkipped following duplicate host rpms from repo\n")
+                _log_lines(logging.DEBUG, ("\t(-) %s" % file_name
+                                           for file_name in duplicate_host_rpms))
+            if vm_type == SYSADMIN_SUBSTRING and duplicate_calv_rpms:
+                logger.debug("\nSkipped following duplicate calvados rpm from repo\n")
+                _log_lines(logging.DEBUG, ("\t(-) %s" % file_name
+                                           for file_name in duplicate_calv_rpms))
+            if vm_type == XR_SUBSTRING and duplicate_xr_rpms:
+                logger.debug("\nSkipped following duplicate xr rpm from repo\n")
+                _log_lines(logging.DEBUG, ("\t(-) %s" % file_name
+                                           for file_name in duplicate_xr_rpms))
+        with open(f_giso_rpms, "w") as fdr:
+            fdr.write("".join("%s\n" % name for name in giso_rpm_names))
 
         if self.sp_info_path is not None:
             for vm_type in Giso.VM_TYPE:
@@ -3083,7 +3392,7 @@ class Giso:
                     os.mkdir(giso_repo_path)
                 for sp_rpm_file in rpm_db.vm_sp_rpm_file_paths[vm_type]:
                     rpm_count += 1
-                    shutil.copy('%s' % (sp_rpm_file), giso_repo_path)
+                    rpm_copies.append((sp_rpm_file, giso_repo_path))
 
                     # If sp has hostos rpm then extarct hostos base rpm and copy it to giso_repo_path
                     rpm_file_basename = os.path.basename(sp_rpm_file)
@@ -3097,7 +3406,15 @@ class Giso:
                         if (plat in rpm_file_basename) and (HOSTOS_SUBSTRING in rpm_file_basename): 
                             sysadmin_base_rpm = self.get_base_rpm(plat, vmt, rpm_file_basename, self.giso_dir, giso_repo_path)
                             logger.debug("\nbase rpm of %s: %s" % (sp_rpm_file, sysadmin_base_rpm))
-  
+
+        self.cleanup_initrd_cache()
+
+        # The copies are independent and I/O bound, so overlap them
+        if rpm_copies:
+            with concurrent.futures.ThreadPoolExecutor(
+                    max_workers=min(8, len(rpm_copies))) as executor:
+                list(executor.map(lambda copy: _copy_in_kernel(*copy),
+                                  rpm_copies))
 
         if rpm_count > MAX_RPM_SUPPORTED_BY_INSTALL:
             logger.error("\nError: Total number of supported rpms in the "
@@ -3108,50 +3425,62 @@ class Giso:
             rpm_db.cleanup_tmp_sp_data()
             sys.exit(-1)
 
+        # The artifact copies and md5sums are independent of each other,
+        # so run them side by side and collect the results afterwards.
+        artifact_pool = concurrent.futures.ThreadPoolExecutor(max_workers=4)
+        artifact_copies = []
+        md5_futures = {}
         if self.xrconfig:
             logger.info("\nXR Config file:")
             logger.info('\t%s' % Giso.XR_CONFIG_FILE_NAME)
-            shutil.copy(self.xrconfig, "%s/%s" % (self.giso_dir, 
-                                                  Giso.XR_CONFIG_FILE_NAME))
+            artifact_copies.append(artifact_pool.submit(shutil.copy,
+                                   self.xrconfig, "%s/%s" % (self.giso_dir,
+                                   Giso.XR_CONFIG_FILE_NAME)))
             config = True
-            cmd = "md5sum %s" %(self.xrconfig)
-            result = run_cmd(cmd)
-            config_md5sum = result["output"].split(" ")[0]
-            logger.debug("Md5sum of Config: %s" %(config_md5sum))
-            self.set_xrconfig_md5sum(config_md5sum)
+            md5_futures["Config"] = (artifact_pool.submit(_md5sum,
+                                     self.xrconfig), self.set_xrconfig_md5sum)
 
         if self.ztp_ini:
             logger.info("\nZTP INI file:")
             logger.info('\t%s' % Giso.ZTP_INI_FILE_NAME)
-            shutil.copy(self.ztp_ini, "%s/%s" % (self.giso_dir, 
-                                                  Giso.ZTP_INI_FILE_NAME))
+            artifact_copies.append(artifact_pool.submit(shutil.copy,
+                                   self.ztp_ini, "%s/%s" % (self.giso_dir,
+                                   Giso.ZTP_INI_FILE_NAME)))
             ztp_ini = True
-            cmd = "md5sum %s" %(self.ztp_ini)
-            result = run_cmd(cmd)
-            ztp_ini_md5sum = result["output"].split(" ")[0]
-            logger.debug("Md5sum of ztp_ini: %s" %(ztp_ini_md5sum))
-            self.set_ztp_ini_md5sum(ztp_ini_md5sum)
+            md5_futures["ztp_ini"] = (artifact_pool.submit(_md5sum,
+                                      self.ztp_ini), self.set_ztp_ini_md5sum)
 
         if self.sp_info_path:
             #logger.info('\t%s' % self.sp_info_path)
             logger.info("\nService Pack:")
             logger.info('\t%s' % os.path.basename(rpm_db.latest_sp_name))
-            shutil.copy(self.sp_info_path, "%s/%s" % (self.giso_dir, 
-                                                      os.path.basename(self.sp_info_path)))
+            artifact_copies.append(artifact_pool.submit(shutil.copy,
+                                   self.sp_info_path, "%s/%s" % (self.giso_dir,
+                                   os.path.basename(self.sp_info_path))))
             service_pack = True
 
         if self.script:
             logger.info("\nUser script:")
             logger.info('\t%s' % Giso.GISO_SCRIPT)
-            shutil.copy(self.script, "%s/%s" % (self.giso_dir, 
-                                                  Giso.GISO_SCRIPT))
-            cmd = "chmod +x %s/%s"%(self.giso_dir, Giso.GISO_SCRIPT)
+            giso_script = "%s/%s" % (self.giso_dir, Giso.GISO_SCRIPT)
+            artifact_copies.append(artifact_pool.submit(shutil.copy,
+                                   self.script, giso_script))
             script = True
-            cmd = "md5sum %s" %(self.script)
-            result = run_cmd(cmd)
-            script_md5sum = result["output"].split(" ")[0]
-            logger.debug("Md5sum of script: %s" %(script_md5sum))
-            self.set_script_md5sum(script_md5sum)
+            md5_futures["script"] = (artifact_pool.submit(_md5sum,
+                                     self.script), self.set_script_md5sum)
+
+        with artifact_pool:
+            for future in artifact_copies:
+                future.result()
+            for name, (future, setter) in md5_futures.items():
+                md5sum = future.result()
+                logger.debug("Md5sum of %s: %s" % (name, md5sum))
+                setter(md5sum)
+
+        if self.script:
+            # chmod +x
+            os.chmod(giso_script, os.stat(giso_script).st_mode |
+                     stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
  
         rpm_db.cleanup_tmp_sp_data()
 
@@ -3223,10 +3552,9 @@ class Giso:
                     bridgetool = os.path.join(dirname, 'gisobridgedb.py')
                     # Initialize fsroot to query in chrooted env
                     fsroot = None
-                    for vm_type in Giso.VM_TYPE:
-                        if self.vm_iso[vm_type] and \
-                                self.vm_iso[vm_type].iso_extract_path:
-                            fsroot = self.vm_iso[vm_type].iso_extract_path
+                    for vm_iso in self.vm_iso.values():
+                        if vm_iso and vm_iso.iso_extract_path:
+                            fsroot = vm_iso.iso_extract_path
                             break
                     cmd = "{executable} {tool} --repo {repo} --out-directory {outdir} \
                           --matrixfile {matfile} --platform {plat} --fsroot {fs} \
@@ -3268,9 +3596,7 @@ class Giso:
                     shutil.rmtree(src_dir, ignore_errors=True)
 
             #update bzimage for 663/664/702 fretta to support >2GB ISO
-            if plat == "ncs5500" and ((self.get_bundle_iso_version() == "6.6.3") or
-                                      (self.get_bundle_iso_version() == "6.6.4") or
-                                      (self.get_bundle_iso_version() == "7.0.2")):
+            if self.needs_bzimage_update(plat):
                self.update_bzimage(self.giso_dir)
 
             if hasattr(args, 'optimize') and args.optimize:
@@ -3282,33 +3608,41 @@ class Giso:
                 # 4. Move new signature and initrd in this dir 
                 # 5. Create Giso
                 if plat in Giso.NESTED_ISO_PLATFORMS :
-                    self.build_system_image()
                     if self.giso_rpm_path is SIGNED_NCS5500_RPM_PATH:
+                       self.build_system_image(keep_extract=True)
                        self.recreate_initrd_nested_platform_7xx()
                     else:
+                       self.build_system_image()
                        self.recreate_initrd_nested_platform()
                 else :
                     self.recreate_initrd_non_nested_platform()
                 self.update_signature(self.giso_dir)
-                if os.path.exists(self.giso_dir+"/boot/grub/stage2_eltorito"):
-                    cmd = "mkisofs -R -uid 0 -gid 0 -b boot/grub/stage2_eltorito -no-emul-boot -input-charset utf-8 \
-                        -boot-load-size 4 -boot-info-table -o %s %s" % (self.giso_name, self.giso_dir)
-                else:
-                    cmd = "mkisofs -R -uid 0 -gid 0 -o %s %s" % (self.giso_name, self.giso_dir)
-                run_cmd(cmd)
-
-            else:
-                if os.path.exists(self.giso_dir+"/boot/grub/stage2_eltorito"):
-                    cmd = "mkisofs -R -uid 0 -gid 0 -b boot/grub/stage2_eltorito -no-emul-boot -input-charset utf-8 \
-                            -boot-load-size 4 -boot-info-table -o %s %s" \
-                            % (self.giso_name, self.giso_dir)
-                else :
-                    cmd = "mkisofs -R -uid 0 -gid 0 -o %s %s" % (self.giso_name, self.giso_dir)
-                run_cmd(cmd)
+            _mkisofs(self.giso_name, self.giso_dir)
         return 0
             
-    def build_system_image(self):
-        """ extract system_image """
+    #
+    # Copy the giso metadata of "src_dir" into "dst_dir": giso_* files,
+    # sp_* files when a service pack is present, the optional xr config,
+    # autorun script and ztp ini, and the *.yml metadata. One directory
+    # listing serves all of the checks.
+    #
+    def copy_giso_metadata(self, src_dir, dst_dir):
+        names = [os.path.basename(path) for path in _scandir_paths(src_dir)]
+        has_sp = "sp_info.txt" in names
+        optional_files = (Giso.XR_CONFIG_FILE_NAME, Giso.GISO_SCRIPT,
+                          Giso.ZTP_INI_FILE_NAME)
+        for name in names:
+            if name.startswith("giso_") or name.endswith(".yml") or \
+                    (has_sp and name.startswith("sp_")) or \
+                    name in optional_files:
+                shutil.copy(os.path.join(src_dir, name), dst_dir)
+
+    def build_system_image(self, keep_extract=False):
+        """ extract system_image
+
+            With keep_extract the updated extract of system_image.iso is
+            left at self.system_image_extract_path for the caller to reuse.
+        """
 
         pwd = cwd
         self.system_image_extract_path = tempfile.mkdtemp(dir=pwd)
@@ -3317,22 +3651,11 @@ class Giso:
             readiso(self.system_image, self.system_image_extract_path)
             os.chdir(self.system_image_extract_path)
 
-            rpms_path = glob.glob('%s/*_rpms' % self.giso_dir)
-            if len(rpms_path):
-                # Move the RPMS to system_image.iso content
-                run_cmd("mv  -f %s/*_rpms %s " % (self.giso_dir, self.system_image_extract_path))
+            # Move the RPMS to system_image.iso content
+            _move_glob('%s/*_rpms' % self.giso_dir, self.system_image_extract_path)
 
             # Move giso metadata to system_image.iso content
-            run_cmd("cp  -f %s/giso_* %s " % (self.giso_dir, self.system_image_extract_path))
-            if os.path.isfile(self.giso_dir+"/sp_info.txt"):
-               run_cmd("cp  -f %s/sp_* %s " % (self.giso_dir, self.system_image_extract_path))
-            if os.path.isfile(self.giso_dir+"/"+Giso.XR_CONFIG_FILE_NAME):
-               run_cmd("cp  -f %s/%s %s " % (self.giso_dir, Giso.XR_CONFIG_FILE_NAME, self.system_image_extract_path))
-            if os.path.isfile(self.giso_dir+"/"+Giso.GISO_SCRIPT):
-               run_cmd("cp  -f %s/%s %s " % (self.giso_dir, Giso.GISO_SCRIPT, self.system_image_extract_path))
-            if os.path.isfile(self.giso_dir+"/"+Giso.ZTP_INI_FILE_NAME):
-               run_cmd("cp  -f %s/%s %s " % (self.giso_dir, Giso.ZTP_INI_FILE_NAME, self.system_image_extract_path))
-            run_cmd("cp  -f %s/*.yml %s " % (self.giso_dir, self.system_image_extract_path))
+            self.copy_giso_metadata(self.giso_dir, self.system_image_extract_path)
 
             # update iso_info.txt file with giso name
             with open("%s/%s" % (self.system_image_extract_path, self.bundle_iso.ISO_INFO_FILE), 'r') as f:
@@ -3345,23 +3668,16 @@ class Giso:
             os.chdir(pwd)
 
             #update bzimage for 663/664/702 fretta to support >2GB ISO
-            if global_platform_name == "ncs5500" and ((self.get_bundle_iso_version() == "6.6.3") or
-                                                      (self.get_bundle_iso_version() == "6.6.4") or
-                                                      (self.get_bundle_iso_version() == "7.0.2")):
+            if self.needs_bzimage_update(global_platform_name):
                self.update_bzimage(self.system_image_extract_path)
 
             # Recreate system_image.iso
-            if os.path.exists(self.system_image_extract_path+"/boot/grub/stage2_eltorito"):
-                cmd = "mkisofs -R -uid 0 -gid 0 -b boot/grub/stage2_eltorito -no-emul-boot -boot-load-size 4 \
-                       -boot-info-table -o new_system_image.iso %s"%(self.system_image_extract_path)
-            else:
-                cmd = "mkisofs -R -uid 0 -gid 0 -o new_system_image.iso %s"%(self.system_image_extract_path)
-
-            run_cmd(cmd)
+            _mkisofs("new_system_image.iso", self.system_image_extract_path)
 
             # Cleanup
-            shutil.rmtree(self.system_image_extract_path)
-            run_cmd("mv new_system_image.iso %s"%(self.system_image))
+            if not keep_extract:
+                shutil.rmtree(self.system_image_extract_path)
+            shutil.move("new_system_image.iso", self.system_image)
         else:
             logger.error("Error: Couldn't create directory for extarcting initrd")
             sys.exit(-1)
@@ -3370,13 +3686,13 @@ class Giso:
         pwd = cwd
         extracted_bundle_path = self.get_bundle_iso_extract_path()
         new_initrd_path = tempfile.mkdtemp(dir=pwd)
-        run_cmd("cp -fr %s/* %s " % (extracted_bundle_path, new_initrd_path))
+        run_cmd_silent("cp -fr %s/* %s " % (extracted_bundle_path, new_initrd_path))
         #over write with new system_image
-        run_cmd("cp %s %s/iso/"%(self.system_image,new_initrd_path))
+        shutil.copy(self.system_image, "%s/iso/" % new_initrd_path)
         # Following workaround to work install replace commit operation 
-        run_cmd("cp -f %s/*.yml %s " % (self.giso_dir, new_initrd_path))
+        _copy_glob('%s/*.yml' % self.giso_dir, new_initrd_path)
         os.chdir(new_initrd_path)
-        cmd = "find . | cpio -o -H newc | gzip > %s/boot/initrd.img"%(self.giso_dir)
+        cmd = "find . | cpio -o -H newc | %s > %s/boot/initrd.img" % (_gzip_command(), self.giso_dir)
         run_cmd(cmd)
         os.chdir(pwd)
         # Cleanup
@@ -3384,71 +3700,55 @@ class Giso:
     def recreate_initrd_nested_platform_7xx(self):
         pwd = cwd
         extracted_bundle_path = self.get_bundle_iso_extract_path()
-        new_initrd_path = tempfile.mkdtemp(dir=pwd)
-        # get system_image.iso extracted copy to new_initrd_path
-        run_cmd("cp -fr %s/* %s " % (extracted_bundle_path, new_initrd_path))
-        extract_system_image_initrd_path = tempfile.mkdtemp(dir=pwd)
-        # extract giso(system_image.iso) created 
-        readiso(self.system_image, extract_system_image_initrd_path)
+        # build_system_image() kept the tree that giso(system_image.iso)
+        # was just created from, so reuse it rather than extract the iso
+        extract_system_image_initrd_path = self.system_image_extract_path
         # extract system_image.iso/boot/initrd.img
         system_image_initrd=("%s/boot/initrd.img"% extract_system_image_initrd_path)
         extract_initrd_r71x=tempfile.mkdtemp(dir=pwd)
-        os.chdir(extract_initrd_r71x)
-        run_cmd("zcat -f %s | cpio -id" %(system_image_initrd)) 
-        os.chdir(pwd)
+        _extract_initrd(system_image_initrd, extract_initrd_r71x)
         if self.is_x86_only:
             nbi_initrd_dir_path=("%s/nbi-initrd"% extract_initrd_r71x)
             if os.path.isdir(nbi_initrd_dir_path):
                 logger.debug ("Deleting nbi-initrd as x86_only option is selected")
-                run_cmd("rm -rf %s" % (nbi_initrd_dir_path))
-        rpms_path = glob.glob('%s/*_rpms' % extract_system_image_initrd_path)
-        if len(rpms_path):
-            # Move the RPMS to initrd content
-            run_cmd("mv  -f %s/*_rpms %s " % (extract_system_image_initrd_path, extract_initrd_r71x))
+                run_cmd_silent("rm -rf %s" % (nbi_initrd_dir_path))
+        # Move the RPMS to initrd content
+        _move_glob('%s/*_rpms' % extract_system_image_initrd_path, extract_initrd_r71x)
         # Move giso metadata to initrd content
-        run_cmd("cp  -f %s/giso_* %s " % (extract_system_image_initrd_path, extract_initrd_r71x))
-        if os.path.isfile(extract_system_image_initrd_path+"/sp_info.txt"):
-           run_cmd("cp  -f %s/sp_* %s " % (extract_system_image_initrd_path, extract_initrd_r71x))
-        if os.path.isfile(extract_system_image_initrd_path+"/"+Giso.XR_CONFIG_FILE_NAME):
-           run_cmd("cp  -f %s/%s %s " % (extract_system_image_initrd_path,
-                                  Giso.XR_CONFIG_FILE_NAME, extract_initrd_r71x))
-        if os.path.isfile(extract_system_image_initrd_path+"/"+Giso.GISO_SCRIPT):
-           run_cmd("cp  -f %s/%s %s " % (extract_system_image_initrd_path,
-                                  Giso.GISO_SCRIPT, extract_initrd_r71x))
-        if os.path.isfile(extract_system_image_initrd_path+"/"+Giso.ZTP_INI_FILE_NAME):
-           run_cmd("cp  -f %s/%s %s " % (extract_system_image_initrd_path,
-                                  Giso.ZTP_INI_FILE_NAME, extract_initrd_r71x))
-
-
-        run_cmd("cp  -f %s/*.yml %s " % (extract_system_image_initrd_path, extract_initrd_r71x))
+        self.copy_giso_metadata(extract_system_image_initrd_path, extract_initrd_r71x)
         os.chdir(extract_initrd_r71x)
-        cmd = "find . | cpio -o -H newc | gzip > %s/boot/initrd.img"%(extract_system_image_initrd_path)
+        cmd = "find . | cpio -o -H newc | %s > %s/boot/initrd.img" % (_gzip_command(), extract_system_image_initrd_path)
         run_cmd(cmd)
         # Update initrd signature
         self.update_signature(extract_system_image_initrd_path)
         os.chdir(pwd)
 
         #update bzimage for 663/664/702 fretta to support >2GB ISO
-        if global_platform_name == "ncs5500" and ((self.get_bundle_iso_version() == "6.6.3") or
-                                                  (self.get_bundle_iso_version() == "6.6.4") or
-                                                  (self.get_bundle_iso_version() == "7.0.2")):
+        if self.needs_bzimage_update(global_platform_name):
            self.update_bzimage(extract_system_image_initrd_path)
 
         # Recreate system_image.iso
-        if os.path.exists(extract_system_image_initrd_path+"/boot/grub/stage2_eltorito"):
-            cmd = "mkisofs -R -uid 0 -gid 0 -b boot/grub/stage2_eltorito -no-emul-boot -boot-load-size 4 \
-                       -boot-info-table -o new_system_image.iso %s"%(extract_system_image_initrd_path)
-        else:
-            cmd = "mkisofs -R -uid 0 -gid 0 -o new_system_image.iso %s"%(extract_system_image_initrd_path)
-
-        run_cmd(cmd) 
-        run_cmd("mv new_system_image.iso %s"%(self.system_image))
+        _mkisofs("new_system_image.iso", extract_system_image_initrd_path)
+        shutil.move("new_system_image.iso", self.system_image)
+        # Only now lay out the new initrd: the extracted bundle minus its
+        # system_image.iso, which is replaced rather than copied over
+        new_initrd_path = tempfile.mkdtemp(dir=pwd)
+        bundle_iso_dir = os.path.join(extracted_bundle_path, "iso")
+        os.mkdir("%s/iso" % new_initrd_path)
+        for src_dir, dst_dir, skip in (
+                (extracted_bundle_path, new_initrd_path, bundle_iso_dir),
+                (bundle_iso_dir, "%s/iso" % new_initrd_path,
+                 "%s/system_image.iso" % bundle_iso_dir)):
+            paths = [path for path in _scandir_paths(src_dir) if path != skip]
+            if paths:
+                run_cmd_silent("cp -fr --reflink=auto %s %s"
+                               % (" ".join(paths), dst_dir))
         # replace system_image.iso
-        run_cmd("cp %s %s/iso/"%(self.system_image,new_initrd_path))
+        shutil.copy(self.system_image, "%s/iso/" % new_initrd_path)
         # Following workaround to work install replace commit operation 
-        run_cmd("cp  -f %s/*.yml %s " % (self.giso_dir, new_initrd_path))
+        _copy_glob('%s/*.yml' % self.giso_dir, new_initrd_path)
         os.chdir(new_initrd_path)
-        cmd = "find . | cpio -o -H newc | gzip > %s/boot/initrd.img"%(self.giso_dir)
+        cmd = "find . | cpio -o -H newc | %s > %s/boot/initrd.img" % (_gzip_command(), self.giso_dir)
         run_cmd(cmd)
         os.chdir(pwd)
         # Cleanup
@@ -3465,33 +3765,22 @@ class Giso:
         else :
             extracted_bundle_path = self.get_bundle_iso_extract_path()
         new_initrd_path = tempfile.mkdtemp(dir=pwd)
-        run_cmd("cp -fr %s/* %s " % (extracted_bundle_path, new_initrd_path))
-        run_cmd("rm -f %s/*.rpm  " % (new_initrd_path))
+        # Leave out the top level rpms of the bundle rather than copying
+        # them only to delete them again, and share data via reflinks
+        bundle_paths = [path for path in _scandir_paths(extracted_bundle_path)
+                        if not path.endswith(".rpm")]
+        if bundle_paths:
+            run_cmd_silent("cp -fr --reflink=auto %s %s "
+                           % (" ".join(bundle_paths), new_initrd_path))
         #copy GISO related stuff
-        rpms_path = glob.glob('%s/*_rpms' % self.giso_dir)
-        if len(rpms_path):
-            # Move the RPMS to system_image.iso content
-            run_cmd("mv  -f %s/*_rpms %s " % (self.giso_dir, new_initrd_path))
+        # Move the RPMS to system_image.iso content
+        _move_glob('%s/*_rpms' % self.giso_dir, new_initrd_path)
 
         # Move giso metadata to system_image.iso content
-        run_cmd("cp  -f %s/giso_* %s " % (self.giso_dir, new_initrd_path))
-        if os.path.isfile(self.giso_dir+"/sp_info.txt"):
-           run_cmd("cp  -f %s/sp_* %s " % (self.giso_dir, new_initrd_path))
-        if os.path.isfile(self.giso_dir+"/"+Giso.XR_CONFIG_FILE_NAME):
-           run_cmd("cp  -f %s/%s %s " % (self.giso_dir, \
-                                  Giso.XR_CONFIG_FILE_NAME, new_initrd_path))
-        if os.path.isfile(self.giso_dir+"/"+Giso.GISO_SCRIPT):
-           run_cmd("cp  -f %s/%s %s " % (self.giso_dir, \
-                                  Giso.GISO_SCRIPT, new_initrd_path))
-        if os.path.isfile(self.giso_dir+"/"+Giso.ZTP_INI_FILE_NAME):
-           run_cmd("cp  -f %s/%s %s " % (self.giso_dir, \
-                                  Giso.ZTP_INI_FILE_NAME, new_initrd_path))
-
-
-        run_cmd("cp  -f %s/*.yml %s " % (self.giso_dir, new_initrd_path))
+        self.copy_giso_metadata(self.giso_dir, new_initrd_path)
 
         os.chdir(new_initrd_path)
-        cmd = "find . | cpio -o -H newc | gzip > %s/boot/initrd.img"%(self.giso_dir)
+        cmd = "find . | cpio -o -H newc | %s > %s/boot/initrd.img" % (_gzip_command(), self.giso_dir)
         run_cmd(cmd)
         os.chdir(pwd)
         # Cleanup
@@ -3510,38 +3799,29 @@ class Giso:
         logger.info("\nCreating signing environment...\n")
         logger.debug("ISO path: %s" %(self.bundle_iso.get_iso_path()))
         plat = self.get_bundle_iso_platform_name()
+        # The iso path may be relative to the build directory, while for
+        # nested platforms we will be inside a tmp directory by now
+        iso_path = os.path.join(cwd, self.bundle_iso.get_iso_path())
         if plat in Giso.NESTED_ISO_PLATFORMS :
-            cmd = "IFS='[] ' read -a a <<< $(isoinfo -i %s -R -l | grep \" initrd.img\") " \
-                  "&& dd bs=2048 skip=${a[8]} if=%s | head -c ${a[4]} | " \
-                  "cpio -i --to-stdout --quiet  etc/show_version.txt | " \
-                  "grep \"Lineup =\" | cut -d ' ' -f3" \
-                  %(self.bundle_iso.get_iso_path(), self.bundle_iso.get_iso_path())
+            # initrd.img is stored uncompressed, read it straight from its
+            # extent in the iso
+            result = run_argv(["isoinfo", "-i", iso_path, "-R", "-l"])
+            match = _ISOINFO_INITRD_RE.search(result["output"])
+            show_version = None
+            if match:
+                with open(iso_path, 'rb') as iso:
+                    iso.seek(int(match.group(2)) * 2048)
+                    show_version = _cpio_member(iso, "etc/show_version.txt")
+            devline = _lineup_of(show_version)
         else :
-            cmd = "isoinfo -i %s -R -x /boot/initrd.img | gunzip -c | " \
-                  "cpio -i --to-stdout --quiet  etc/show_version.txt | " \
-                  "grep \"Lineup =\" | cut -d ' ' -f3" \
-                   %(self.bundle_iso.get_iso_path())
-        pwd=os.getcwd()
-        # In case of nested platform we will be inside tmp directory
-        # to sign the inner initrd. To access the iso here if relative path
-        # of mini is provided we temporariliy moved to build directory 
-        os.chdir(cwd)
-        result = run_cmd(cmd)
-        os.chdir(pwd) 
-        devline = result["output"].rstrip("\n")
+            devline = self.read_initrd_lineup(iso_path)
         logger.debug("Devline: %s" %devline)
 
         if not devline:
             logger.debug("platform: %s" %plat)
             if plat == "asr9k":
                 logger.debug("This might  be shrinked asr9k image tryin with different  path")
-                cmd = "isoinfo -i %s -R -x /boot/initrd.img | gunzip -c | " \
-                  "cpio -i --to-stdout --quiet files*.cpio | " \
-                  "cpio -i --to-stdout --quiet  etc/show_version.txt | " \
-                  "grep \"Lineup =\" | cut -d ' ' -f3" \
-                   %(self.bundle_iso.get_iso_path())
-                result = run_cmd(cmd)
-                devline = result["output"].rstrip("\n")
+                devline = self.read_initrd_lineup(iso_path, "files*.cpio")
                 logger.debug("Devline for shrinked a9k image: %s" %devline)
 
         if not devline:
@@ -3550,6 +3830,31 @@ class Giso:
 
         exr_int.patch_signing_env (devline)
 
+    #
+    # Lineup from etc/show_version.txt of the gzipped /boot/initrd.img of
+    # iso: "iso_path". The initrd is streamed out of the iso and unpacked
+    # in-process. With "inner", show_version.txt is looked up in the
+    # first member of the initrd matching that glob instead.
+    #
+    def read_initrd_lineup(self, iso_path, inner=None):
+        proc = subprocess.Popen(["isoinfo", "-i", iso_path, "-R",
+                                 "-x", "/boot/initrd.img"],
+                                stdout=subprocess.PIPE)
+        try:
+            with gzip.GzipFile(fileobj=proc.stdout) as initrd:
+                if inner:
+                    inner_cpio = _cpio_member(initrd, inner)
+                    if inner_cpio is None:
+                        return ""
+                    initrd = io.BytesIO(inner_cpio)
+                return _lineup_of(_cpio_member(initrd,
+                                               "etc/show_version.txt"))
+        except (OSError, EOFError):
+            return ""
+        finally:
+            proc.stdout.close()
+            proc.wait()
+
     def update_signature(self, path):
         """ Pretend to be in workspace as thats a requirement for signing and 
             get platforms .cer and .der files
@@ -3578,33 +3883,34 @@ class Giso:
         logger.debug("\nOutput of {} is \n {}".format(SIGNING_CMD, result["output"]))
 
         # Update MD5SUM in gisobuild after initrd
-        with open("%s/%s" % (path, Giso.ISO_INFO_FILE), 'r') as f:
+        iso_info_file = "%s/%s" % (path, Giso.ISO_INFO_FILE)
+        with open(iso_info_file, 'rb') as f:
             iso_info_raw = f.read()
 
-        #iso_info_raw = iso_info_raw.replace(, giso_name_string)
-        cmd = "md5sum %s/boot/initrd.img"%(path)
-        result = run_cmd(cmd)
-        status = result["rc"]
-        if not status :
-            md5sum_of_initrd = result["output"].split(" ")[0].strip()
-        else :
-            raise RuntimeError("Error CMD=%s returned --->%s" % (cmd, result["output"]))
-
-        iso_info_raw = iso_info_raw.replace(re.search(r'Initrd: initrd.img (.*)\n',
-            iso_info_raw).group(1),md5sum_of_initrd)
-        with open("%s/%s" % (path, Giso.ISO_INFO_FILE), 'w') as f:
+        md5sum_of_initrd = _md5sum("%s/boot/initrd.img" % path).encode()
+        iso_info_raw, updated = _INITRD_MD5_RE.subn(
+            lambda m: m.group(1) + md5sum_of_initrd, iso_info_raw, count=1)
+        if not updated:
+            raise RuntimeError("No initrd md5sum entry found in %s"
+                               % iso_info_file)
+        # Write aside and rename so iso_info.txt is never left half written
+        with open(iso_info_file + ".tmp", 'wb') as f:
             f.write(iso_info_raw)
+        shutil.copymode(iso_info_file, iso_info_file + ".tmp")
+        os.replace(iso_info_file + ".tmp", iso_info_file)
         return
 
     def __enter__(self):
         return self
 
     def __exit__(self, type_name, value, tb):
+        # Left behind when build_giso did not finish its base rpm lookups
+        self.cleanup_initrd_cache()
         if (self and self.giso_dir) and os.path.exists(self.giso_dir):
-            shutil.rmtree(self.giso_dir)
-        for vm_type in Giso.VM_TYPE:
-            if self.vm_iso[vm_type]:
-                self.vm_iso[vm_type].__exit__(type, value, tb)
+            _rmtree_in_background(self.giso_dir)
+        for vm_iso in self.vm_iso.values():
+            if vm_iso:
+                vm_iso.__exit__(type, value, tb)
         if self.bundle_iso:
             self.bundle_iso.__exit__(type, value, tb)
             if self.system_image and os.path.exists(self.system_image):
@@ -3612,14 +3918,14 @@ class Giso:
 
 def print_giso_info(iso_file):
     ISOINFO="isoinfo"
-    cmd = ("%s -i %s -R -x /giso_info.txt"%(ISOINFO,iso_file))
-    result = run_cmd(cmd)
-    status = result["rc"]
-    if status :
-        logger.error("Command :%s failed with error :\n%s"%(cmd, result["output"]))
+    cmd = [ISOINFO, "-i", iso_file, "-R", "-x", "/giso_info.txt"]
+    try:
+        # stderr is only part of the output when isoinfo fails
+        result = run_argv(cmd)
+    except RuntimeError as error:
+        logger.error("Command :%s failed with error :\n%s"%(" ".join(cmd), error))
         return -1
-    else :
-        logger.info("\n%s\n" %(result["output"]))
+    logger.info("\n%s\n" %(result["output"]))
 
 def initialize_globals (wd, argv, modlogger, platform_name):
     global cwd
@@ -3643,26 +3949,39 @@ def readiso(iso_file, out_dir):
     ISOINFO="isoinfo"
     DIR_PREFIX="Directory listing of /"
 
-    cmd = ("%s -R -l -i %s "%(ISOINFO,iso_file))
-    result = run_cmd(cmd) 
-    status = result["rc"]
-    if status :
-        logger.error("Command :%s failed with error :\n%s"%(cmd, result["output"]))
+    cmd = [ISOINFO, "-R", "-l", "-i", iso_file]
+    try:
+        result = run_argv(cmd)
+    except RuntimeError as error:
+        logger.error("Command :%s failed with error :\n%s"%(" ".join(cmd), error))
         return -1
 
-    for line in result["output"].splitlines():
-        if not line :
-            continue
-        elif line.startswith("d"):
-            continue
-        elif line.startswith(DIR_PREFIX):
-            dir_name = line.replace(DIR_PREFIX,'').strip()
-            if not os.path.exists(os.path.join(out_dir,dir_name)):
-                os.makedirs(os.path.join(out_dir,dir_name))
-        else:
-            file_name = line.split()[-1]
-            if file_name == ".." :
+    # Every file is copied straight from its extent in the iso, using the
+    # size and extent of the one listing above
+    with open(iso_file, 'rb') as iso:
+        for line in result["output"].splitlines():
+            if not line :
                 continue
-            out_dir_file = os.path.join(out_dir,dir_name,file_name)
-            cmd = "IFS='[] ' read -a a <<< $(%s -i %s -R -l | grep \" %s\") && dd bs=2048 skip=${a[8]} if=%s | head -c ${a[4]} > %s" %(ISOINFO, iso_file, file_name, iso_file, out_dir_file)
-            run_cmd(cmd)
+            elif line.startswith("d"):
+                continue
+            elif line.startswith(DIR_PREFIX):
+                dir_name = line.replace(DIR_PREFIX,'').strip()
+                if not os.path.exists(os.path.join(out_dir,dir_name)):
+                    os.makedirs(os.path.join(out_dir,dir_name))
+            else:
+                file_name = line.split()[-1]
+                if file_name == ".." :
+                    continue
+                out_dir_file = os.path.join(out_dir,dir_name,file_name)
+                entry = _ISOINFO_ENTRY_RE.match(line)
+                if not entry:
+                    continue
+                remaining = int(entry.group(1))
+                iso.seek(int(entry.group(2)) * 2048)
+                with open(out_dir_file, 'wb') as fd:
+                    while remaining:
+                        chunk = iso.read(min(remaining, 1024 * 1024))
+                        if not chunk:
+                            break
+                        fd.write(chunk)
+                        remaining -= len(chunk)
@@ -28,7 +28,6 @@ import argparse
 import logging
 import os
 import pathlib
-import re
 from typing import Any, Dict, Set, Tuple
 
 from utils import bes, gisoglobals, gisoutils
@@ -69,6 +68,20 @@ class InvalidPkgListPkgError(Exception):
         super().__init__("\n".join(lines))
 
 
+def _existing_file(path: str) -> str:
+    """Argparse type for options naming an input file that must exist."""
+    if not os.path.isfile(path):
+        raise argparse.ArgumentTypeError("{} does not exist.".format(path))
+    return path
+
+
+def _existing_path(path: str) -> str:
+    """Argparse type for options naming a file or directory that must exist."""
+    if path and not os.path.exists(path):
+        raise argparse.ArgumentTypeError("{} does not exist.".format(path))
+    return path
+
+
 def parsecli() -> Tuple[argparse.Namespace, argparse.ArgumentParser]:
     """Parse CLI options."""
     parser = argparse.ArgumentParser(
@@ -78,13 +91,14 @@ def parsecli() -> Tuple[argparse.Namespace, argparse.ArgumentParser]:
     parser.add_argument(
         "--iso",
         dest="iso",
-        type=str,
+        type=_existing_file,
         help="Path to an input LNT ISO, EXR mini/full ISO, or a GISO.",
     )
 
     parser.add_argument(
         "--repo",
         dest="repo",
+        type=_existing_path,
         nargs="+",
         default=[],
         help="Path to RPM repository. For LNT, user can "
@@ -105,11 +119,17 @@ def parsecli() -> Tuple[argparse.Namespace, argparse.ArgumentParser]:
     )
 
     parser.add_argument(
-        "--xrconfig", dest="xrconfig", type=str, help="Path to XR config file"
+        "--xrconfig",
+        dest="xrconfig",
+        type=_existing_file,
+        help="Path to XR config file",
     )
 
     parser.add_argument(
-        "--ztp-ini", dest="ztp_ini", type=str, help="Path to user ztp ini file"
+        "--ztp-ini",
+        dest="ztp_ini",
+        type=_existing_file,
+        help="Path to user ztp ini file",
     )
 
     parser.add_argument(
@@ -215,7 +235,7 @@ def parsecli() -> Tuple[argparse.Namespace, argparse.ArgumentParser]:
     exrgroup.add_argument(
         "--script",
         dest="script",
-        type=str,
+        type=_existing_file,
         help="Path to user executable script "
         "executed as part of bootup post activate.",
     )
@@ -381,6 +401,9 @@ def parsecli() -> Tuple[argparse.Namespace, argparse.ArgumentParser]:
 def validate_and_setup_args(args: argparse.Namespace) -> argparse.Namespace:
     """Validate input arguments. Also return if exr or lnt iso is provided."""
 
+    # Paths given on the command line were already checked by their argparse
+    # types; the checks below still cover values taken from --yamlfile.
+
     if not args.iso:
         raise AssertionError("Please provide an input ISO")
 
@@ -398,10 +421,7 @@ def validate_and_setup_args(args: argparse.Namespace) -> argparse.Namespace:
     args.exriso = gisoutils.is_platform_exr(args.iso)
 
     # Check if input iso is a GISO, we are trying to extend.
-    if re.match(".*golden.*", str(args.iso)):
-        args.gisoExtend = True
-    else:
-        args.gisoExtend = False
+    args.gisoExtend = "golden" in args.iso
 
     # Check if optimized or a full iso build is being triggered.
     if hasattr(args, "optimize") or hasattr(args, "fullISO"):
@@ -412,15 +432,15 @@ def validate_and_setup_args(args: argparse.Namespace) -> argparse.Namespace:
                     f"{display_string} build workflow is not supported."
                 )
 
-    # Check repo given in input.
-    if args.repo:
-        for repopath in args.repo:
-            if repopath and not os.path.exists(repopath):
-                raise AssertionError(
-                    "RPM Repository path {} does not exist.".format(repopath)
-                )
-
-    args.repo = [os.path.abspath(repopath) for repopath in args.repo]
+    # Check repo given in input, making the paths absolute in the same pass.
+    repo_paths = []
+    for repopath in args.repo:
+        if repopath and not os.path.exists(repopath):
+            raise AssertionError(
+                "RPM Repository path {} does not exist.".format(repopath)
+            )
+        repo_paths.append(os.path.abspath(repopath))
+    args.repo = repo_paths
 
     # If --pkglist is specified, --repo must be provided
     if args.pkglist and not args.repo:
@@ -550,6 +570,11 @@ def main() -> None:
     if not cli_args.out_directory:
         cli_args.out_directory = DFLT_OUTPUT_DIR
 
+    # Nothing to build from, so just show the usage.
+    if not cli_args.iso:
+        parser.print_help(sys.stderr)
+        sys.exit(-1)
+
     # Setup the tool arguments.
     cli_args = validate_and_setup_args(cli_args)
 
@@ -31,7 +31,6 @@ import logging
 import os
 import pwd
 import shutil
-import socket
 import subprocess
 import sys
 import time
@@ -161,6 +160,9 @@ def log_cmd_call(args: argparse.Namespace, yaml_args: Dict[str, Any]) -> None:
     if not _LOGGING_ENABLED:
         return
 
+    # Only needed when BES logging is on, so not imported at startup.
+    import socket
+
     # Log the command, user, and host information.
     log("command: %s", " ".join(sys.argv))
     if yaml_args:
@@ -19,7 +19,6 @@ or implied.
 """
 
 import argparse
-import datetime
 import hashlib
 import json
 import logging
@@ -29,7 +28,6 @@ import sys
 import textwrap
 import threading
 import time
-from logging import handlers
 from pathlib import Path
 from tarfile import TarFile
 from typing import Any, Dict, Iterable, List, Set, Tuple, Union
@@ -78,6 +76,13 @@ def stop_progress() -> None:
 def initialize_console_logging() -> None:
     """Initialize logging INFO messages to console."""
     root_logger = logging.getLogger()
+    # Only one console handler, otherwise every record is printed repeatedly
+    for handler in root_logger.handlers:
+        if (
+            isinstance(handler, logging.StreamHandler)
+            and getattr(handler, "stream", None) is sys.stdout
+        ):
+            return
     # Console message
     ch = logging.StreamHandler(sys.stdout)
     ch.setLevel(logging.INFO)
@@ -105,7 +110,7 @@ def create_working_dir(
     LOGFILE = "{}/{}.log-{}".format(
         LOGDIR,
         module_name,
-        datetime.datetime.now().strftime("%Y-%m-%d:%H:%M:%S.%f"),
+        time.strftime("%Y-%m-%d_%H%M%S"),
     )
     logfile = LOGFILE.format(output_dir=output_dir)
 
@@ -118,7 +123,10 @@ def create_working_dir(
         "%(asctime)s::  %(message)s", "%Y-%m-%d %H:%M:%S"
     )
 
-    # Logs to logfile
+    # Logs to logfile. logging.handlers (and the socket module it pulls in)
+    # is only imported once a build actually sets up its log file.
+    from logging import handlers
+
     fh = handlers.RotatingFileHandler(logfile)
     fh.setLevel(logging.DEBUG)
     fh.setFormatter(formatter)
@@ -133,10 +141,29 @@ def match_file_type(file_att: str) -> str:
     return gisoglobals.FILE_TYPE_UNKNOWN
 
 
+def _is_iso9660(filename: str) -> bool:
+    """
+    Check for the ISO 9660 primary volume descriptor signature.
+
+    This is the same "CD001" magic at offset 0x8001 that file(1) uses to
+    report "ISO 9660 CD-ROM filesystem data".
+
+    """
+    try:
+        with open(filename, "rb") as fd:
+            fd.seek(0x8001)
+            return fd.read(5) == b"CD001"
+    except OSError:
+        return False
+
+
 def get_file_type(filename: str) -> str:
     """Get file type."""
     if not os.path.exists(filename):
         raise AssertionError("{} does not exist.".format(filename))
+    # ISOs are by far the most common input, identify them without a fork
+    if _is_iso9660(filename):
+        return gisoglobals.FILE_TYPE_ISO
     cmd = "file -L {}".format(filename)
     output, _ = subprocs.execute(cmd.split())
     file_att = output.split(":")[1].strip()